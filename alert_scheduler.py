@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import argparse
+import threading
+import urllib.request
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+
+def alert_payload(alert):
+    """Render an alert into a JSON-serialisable dict"""
+    payload = alert.to_dict()
+    payload['created_at'] = payload['created_at'].isoformat()
+    if isinstance(payload['value'], float) and np.isnan(payload['value']):
+        payload['value'] = None
+    return payload
+
+
+class JsonlFileSink:
+    """Appends every alert as one JSON line to a local log file"""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def send(self, alerts):
+        with open(self.path, 'a') as f:
+            for alert in alerts:
+                f.write(json.dumps(alert_payload(alert)) + "\n")
+
+
+class WebhookSink:
+    """POSTs each evaluation's alerts as one JSON document to a webhook URL"""
+
+    def __init__(self, url, timeout=2.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alerts):
+        body = json.dumps({'alerts': [alert_payload(alert) for alert in alerts]}).encode()
+        request = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class InAppFeedSink:
+    """Keeps the most recent alerts in memory for the dashboard to display"""
+
+    def __init__(self, maxlen=500):
+        self.alerts = deque(maxlen=maxlen)
+        self.latest = []  # Alerts raised by the most recent evaluation
+        self._lock = threading.Lock()
+
+    def send(self, alerts):
+        with self._lock:
+            self.alerts.extend(alerts)
+            self.latest = list(alerts)
+
+    def recent(self, count=50):
+        with self._lock:
+            return list(self.alerts)[-count:][::-1]
+
+
+class WebhookStub:
+    """Local HTTP server that accepts webhook POSTs and keeps the last payloads, for testing sinks"""
+
+    def __init__(self, host="127.0.0.1", port=8765, maxlen=100):
+        self.received = deque(maxlen=maxlen)
+        received = self.received
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                received.append(json.loads(self.rfile.read(length) or b'{}'))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}/"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="webhook-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class AlertScheduler:
+    """Evaluates alerts on a fixed cadence in one background thread and fans them out to sinks
+
+    Replaces per-page-view evaluation: exactly one thread calls check_alerts, however many
+    dashboard sessions are open. Every scheduler has an in-app feed sink; further sinks
+    receive each evaluation's alerts in order. Detection latency is measured per alert from
+    the moment its readings were taken to delivery through every sink.
+    """
+
+    def __init__(self, alert_system, data_generator, interval_seconds=10, sinks=None,
+                 maintenance_predictor=None, latency_window=1000):
+        self.alert_system = alert_system
+        self.data_generator = data_generator
+        self.interval_seconds = interval_seconds
+        self.feed = InAppFeedSink()
+        self.sinks = [self.feed] + list(sinks or [])
+        self.maintenance_predictor = maintenance_predictor
+
+        self.evaluations = 0
+        self.failed_evaluations = 0
+        self.evaluation_error = None
+        self.failed_maintenance = 0
+        self.maintenance_error = None
+        self.sink_errors = {}
+        self.last_evaluation = None
+        self._latencies = deque(maxlen=latency_window)
+        self._evaluation_times = deque(maxlen=latency_window)
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the scheduler thread if it is not already running"""
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="alert-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def evaluate(self):
+        """Run one evaluation and deliver its alerts, returning them"""
+        started = time.time()  # Readings are taken at the start of the evaluation
+        current_data = self.data_generator.generate_current_data()
+        machines = self.data_generator.get_machine_list()
+
+        alerts = self.alert_system.check_alerts(current_data, machines, self.data_generator)
+        if self.maintenance_predictor is not None:
+            try:
+                alerts += self.alert_system.check_maintenance_alerts(self.maintenance_predictor.score(self.data_generator))
+            except Exception as error:  # Threshold alerts must still go out while the risk model is failing
+                self.failed_maintenance += 1
+                self.maintenance_error = f"{datetime.now():%H:%M:%S} {type(error).__name__}: {error}"
+        self._evaluation_times.append(time.time() - started)
+
+        for sink in self.sinks:
+            try:
+                sink.send(alerts)
+            except Exception as error:  # A failing sink must not stop detection or the other sinks
+                self.sink_errors[type(sink).__name__] = f"{datetime.now():%H:%M:%S} {error}"
+
+        delivered = time.time()
+        self._latencies.extend([delivered - started] * len(alerts))
+        self.evaluations += 1
+        self.last_evaluation = datetime.now()
+        return alerts
+
+    def _run(self):
+        next_run = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                self.evaluate()
+            except Exception as error:  # One bad evaluation must not end alerting for every session
+                self.failed_evaluations += 1
+                self.evaluation_error = f"{datetime.now():%H:%M:%S} {type(error).__name__}: {error}"
+            next_run += self.interval_seconds
+            # Skip missed ticks instead of bursting after a slow evaluation
+            while next_run <= time.monotonic():
+                next_run += self.interval_seconds
+            if self._stop_event.wait(next_run - time.monotonic()):
+                break
+
+    def get_latency_stats(self):
+        """Detection latency statistics in seconds over the recent window
+
+        'worst_case' adds the cadence to the measured delivery latency, since a condition
+        can start just after an evaluation and is only seen on the next one.
+        """
+        latencies = np.array(self._latencies) if self._latencies else np.zeros(0)
+        evaluation_times = np.array(self._evaluation_times) if self._evaluation_times else np.zeros(0)
+        p95 = float(np.percentile(latencies, 95)) if len(latencies) else float('nan')
+        return {
+            'evaluations': self.evaluations,
+            'alerts': len(latencies),
+            'mean': float(latencies.mean()) if len(latencies) else float('nan'),
+            'p95': p95,
+            'max': float(latencies.max()) if len(latencies) else float('nan'),
+            'evaluation_mean': float(evaluation_times.mean()) if len(evaluation_times) else float('nan'),
+            'worst_case': self.interval_seconds + p95 if len(latencies) else float('nan')
+        }
+
+
+def main():
+    from data_generator import ManufacturingDataGenerator
+    from alert_system import AlertSystem
+
+    parser = argparse.ArgumentParser(description="Run the alert scheduler without the dashboard")
+    parser.add_argument("--interval", type=float, default=10, help="Evaluation cadence in seconds")
+    parser.add_argument("--jsonl", default="logs/alerts.jsonl", help="JSONL log file sink")
+    parser.add_argument("--webhook-url", help="Webhook URL to POST alerts to")
+    parser.add_argument("--webhook-stub", action="store_true",
+                        help="Start a local webhook stub and send alerts to it")
+    args = parser.parse_args()
+
+    sinks = [JsonlFileSink(args.jsonl)]
+    stub = None
+    if args.webhook_stub:
+        stub = WebhookStub(port=0).start()
+        sinks.append(WebhookSink(stub.url))
+    if args.webhook_url:
+        sinks.append(WebhookSink(args.webhook_url))
+
+    scheduler = AlertScheduler(AlertSystem(), ManufacturingDataGenerator(), args.interval, sinks)
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(args.interval)
+            stats = scheduler.get_latency_stats()
+            received = f", webhook stub received {len(stub.received)} posts" if stub else ""
+            print(f"{stats['evaluations']} evaluations, {stats['alerts']} alerts, "
+                  f"latency mean {stats['mean'] * 1000:.1f}ms p95 {stats['p95'] * 1000:.1f}ms{received}")
+    except KeyboardInterrupt:
+        scheduler.stop()
+        if stub:
+            stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,163 @@
-from datetime import datetime, timedelta
+from collections import namedtuple
+from datetime import datetime
 import random
+import time
+import threading
+import numpy as np
+import pandas as pd
+from utils import local_epoch_seconds
+
+SEVERITIES = ['Critical', 'Major', 'Warning', 'Info']
+
+# Static description of every alert the system can raise. Records only store the
+# index into this table, so titles and messages are rendered when displayed.
+AlertKind = namedtuple('AlertKind', ['severity', 'metric', 'title', 'message', 'label'])
+
+ALERT_KINDS = [
+    AlertKind('Critical', 'OEE', 'Low Overall Equipment Effectiveness',
+              "OEE has dropped to {value:.1f}%, below threshold of {threshold}%", None),
+    AlertKind('Warning', 'Temperature', 'High Temperature Alert',
+              "Temperature is {value:.1f}°C, exceeding {threshold}°C threshold", None),
+    AlertKind('Info', 'Temperature', 'Low Temperature Alert',
+              "Temperature is {value:.1f}°C, below {threshold}°C threshold", None),
+    AlertKind('Critical', 'Vibration', 'High Vibration Detected',
+              "Vibration level is {value:.2f}mm/s, exceeding safe threshold of {threshold}mm/s", None),
+    AlertKind('Warning', 'Production Rate', 'Low Production Rate',
+              "Production rate is {value:.0f} units/hour, below target of {threshold}", None),
+    AlertKind('Major', 'Efficiency', 'Low Machine Efficiency',
+              "Machine efficiency is {value:.1f}%, below acceptable threshold of {threshold}%", None),
+    AlertKind('Critical', 'Status', 'Machine Error Status',
+              "Machine is in error state and requires immediate attention", 'Error'),
+    AlertKind('Warning', 'Inventory', 'Material Low',
+              "Raw material inventory is running low for Line-A", 'Low'),
+    AlertKind('Info', 'Maintenance', 'Planned Maintenance Due',
+              "Scheduled maintenance window approaching in 2 hours", 'Due'),
+    AlertKind('Major', 'Quality', 'Quality Check Required',
+              "Quality parameters showing deviation from specification", 'Deviation'),
+    AlertKind('Major', 'Maintenance Risk', 'Predicted Maintenance Risk',
+              "Predicted failure risk is {value:.0%}, above {threshold:.0%} threshold", None),
+]
+
+(OEE_LOW, TEMP_HIGH, TEMP_LOW, VIBRATION_HIGH, PRODUCTION_LOW, EFFICIENCY_LOW,
+ MACHINE_ERROR, MATERIAL_LOW, MAINTENANCE_DUE, QUALITY_DEVIATION, MAINTENANCE_RISK) = range(len(ALERT_KINDS))
+
+# Machine names are interned once and referenced by small integer codes
+_machine_names = []
+_machine_codes = {}
+_machine_lock = threading.Lock()
+
+
+def machine_code(machine):
+    """Get the integer code for a machine name, registering it if needed"""
+    code = _machine_codes.get(machine)
+    if code is None:
+        # Sessions and the alert scheduler register concurrently; two threads must not claim one code
+        with _machine_lock:
+            code = _machine_codes.get(machine)
+            if code is None:
+                _machine_names.append(machine)
+                code = _machine_codes[machine] = len(_machine_names) - 1
+    return code
+
+
+class AlertRecord:
+    """Compact alert with lazily rendered display fields"""
+    __slots__ = ('kind', 'machine_code', 'value', 'threshold', 'created_at')
+
+    FIELDS = ('severity', 'title', 'message', 'machine', 'timestamp', 'metric', 'value', 'created_at')
+
+    def __init__(self, kind, machine, value=float('nan'), threshold=None, created_at=None):
+        self.kind = kind
+        self.machine_code = machine_code(machine)
+        self.value = value
+        self.threshold = threshold
+        self.created_at = time.time() if created_at is None else created_at  # Epoch seconds
+
+    @property
+    def severity(self):
+        return ALERT_KINDS[self.kind].severity
+
+    @property
+    def metric(self):
+        return ALERT_KINDS[self.kind].metric
+
+    @property
+    def title(self):
+        return ALERT_KINDS[self.kind].title
+
+    @property
+    def machine(self):
+        return _machine_names[self.machine_code]
+
+    @property
+    def message(self):
+        return ALERT_KINDS[self.kind].message.format(value=self.value, threshold=self.threshold)
+
+    @property
+    def display_value(self):
+        label = ALERT_KINDS[self.kind].label
+        return label if label is not None else self.value
+
+    @property
+    def created_datetime(self):
+        return datetime.fromtimestamp(self.created_at)
+
+    @property
+    def timestamp(self):
+        return self.created_datetime.strftime("%H:%M:%S")
+
+    def __getitem__(self, field):
+        """Dict-style access to the rendered fields, e.g. alert['message']"""
+        if field == 'value':
+            return self.display_value
+        elif field == 'created_at':
+            return self.created_datetime
+        elif field in self.FIELDS:
+            return getattr(self, field)
+        raise KeyError(field)
+
+    def to_dict(self):
+        """Render every field into a plain dict"""
+        return {field: self[field] for field in self.FIELDS}
+
+    def __repr__(self):
+        return f"AlertRecord({self.severity!r}, {self.title!r}, machine={self.machine!r}, value={self.display_value!r})"
+
+
+def evaluate_readings(readings, thresholds):
+    """Evaluate a DataFrame of telemetry readings against thresholds in one vectorized pass
+
+    Applies the same per-machine rules as AlertSystem.check_alerts and returns one row per
+    alert with the kind, machine, value, threshold and epoch created_at of an AlertRecord.
+    """
+    temperature = readings['temperature'].to_numpy()
+    rules = [
+        (TEMP_HIGH, temperature > thresholds['temp_high'], temperature, thresholds['temp_high']),
+        (TEMP_LOW, temperature < thresholds['temp_low'], temperature, thresholds['temp_low']),
+        (VIBRATION_HIGH, readings['vibration'].to_numpy() > thresholds['vibration_high'],
+         readings['vibration'].to_numpy(), thresholds['vibration_high']),
+        (PRODUCTION_LOW, readings['production_rate'].to_numpy() < thresholds['production_low'],
+         readings['production_rate'].to_numpy(), thresholds['production_low']),
+        (EFFICIENCY_LOW, readings['efficiency'].to_numpy() < thresholds['efficiency_low'],
+         readings['efficiency'].to_numpy(), thresholds['efficiency_low']),
+        (MACHINE_ERROR, readings['status'].to_numpy() == 'Error',
+         np.full(len(readings), np.nan), np.nan)
+    ]
+
+    created_at = local_epoch_seconds(readings['timestamp'].to_numpy())
+    machines = readings['machine'].to_numpy()
+    frames = []
+    for kind, mask, values, threshold in rules:
+        frames.append(pd.DataFrame({
+            'kind': np.full(mask.sum(), kind, dtype=np.int8),
+            'machine': machines[mask],
+            'value': values[mask],
+            'threshold': np.full(mask.sum(), threshold, dtype=float),
+            'created_at': created_at[mask]
+        }))
+
+    return pd.concat(frames, ignore_index=True).sort_values('created_at', kind='stable', ignore_index=True)
+
 
 class AlertSystem:
     def __init__(self):
@@ -9,10 +167,12 @@ class AlertSystem:
             'vibration_high': 5.0,
             'production_low': 50,
             'efficiency_low': 70.0,
-            'oee_low': 60.0
+            'oee_low': 60.0,
+            'maintenance_risk_high': 0.5
         }
-        
-        self.alert_history = []
+
+        self.alert_history = []  # AlertRecords, oldest first
+        self.maintenance_at_risk = set()  # Machines above the risk threshold at the last scoring
 
     def update_thresholds(self, new_thresholds):
         """Update alert thresholds"""
@@ -21,156 +181,99 @@ class AlertSystem:
     def check_alerts(self, current_data, machines, data_generator):
         """Check for alert conditions and return active alerts"""
         alerts = []
-        
+        now = time.time()
+
         # Check overall OEE
         if current_data['oee'] < self.thresholds['oee_low']:
-            alerts.append({
-                'severity': 'Critical',
-                'title': 'Low Overall Equipment Effectiveness',
-                'message': f"OEE has dropped to {current_data['oee']:.1f}%, below threshold of {self.thresholds['oee_low']}%",
-                'machine': 'All Lines',
-                'timestamp': datetime.now().strftime("%H:%M:%S"),
-                'metric': 'OEE',
-                'value': current_data['oee']
-            })
+            alerts.append(AlertRecord(OEE_LOW, 'All Lines', current_data['oee'], self.thresholds['oee_low'], now))
 
         # Check individual machines
         for machine in machines:
             machine_status = data_generator.generate_machine_status(machine)
-            
+
             # Temperature alerts
             if machine_status['temperature'] > self.thresholds['temp_high']:
-                alerts.append({
-                    'severity': 'Warning',
-                    'title': 'High Temperature Alert',
-                    'message': f"Temperature is {machine_status['temperature']:.1f}°C, exceeding {self.thresholds['temp_high']}°C threshold",
-                    'machine': machine,
-                    'timestamp': datetime.now().strftime("%H:%M:%S"),
-                    'metric': 'Temperature',
-                    'value': machine_status['temperature']
-                })
-            
+                alerts.append(AlertRecord(TEMP_HIGH, machine, machine_status['temperature'],
+                                          self.thresholds['temp_high'], now))
+
             elif machine_status['temperature'] < self.thresholds['temp_low']:
-                alerts.append({
-                    'severity': 'Info',
-                    'title': 'Low Temperature Alert',
-                    'message': f"Temperature is {machine_status['temperature']:.1f}°C, below {self.thresholds['temp_low']}°C threshold",
-                    'machine': machine,
-                    'timestamp': datetime.now().strftime("%H:%M:%S"),
-                    'metric': 'Temperature',
-                    'value': machine_status['temperature']
-                })
+                alerts.append(AlertRecord(TEMP_LOW, machine, machine_status['temperature'],
+                                          self.thresholds['temp_low'], now))
 
             # Vibration alerts
             if machine_status['vibration'] > self.thresholds['vibration_high']:
-                alerts.append({
-                    'severity': 'Critical',
-                    'title': 'High Vibration Detected',
-                    'message': f"Vibration level is {machine_status['vibration']:.2f}mm/s, exceeding safe threshold of {self.thresholds['vibration_high']}mm/s",
-                    'machine': machine,
-                    'timestamp': datetime.now().strftime("%H:%M:%S"),
-                    'metric': 'Vibration',
-                    'value': machine_status['vibration']
-                })
+                alerts.append(AlertRecord(VIBRATION_HIGH, machine, machine_status['vibration'],
+                                          self.thresholds['vibration_high'], now))
 
             # Production rate alerts
             if machine_status['production_rate'] < self.thresholds['production_low']:
-                alerts.append({
-                    'severity': 'Warning',
-                    'title': 'Low Production Rate',
-                    'message': f"Production rate is {machine_status['production_rate']:.0f} units/hour, below target of {self.thresholds['production_low']}",
-                    'machine': machine,
-                    'timestamp': datetime.now().strftime("%H:%M:%S"),
-                    'metric': 'Production Rate',
-                    'value': machine_status['production_rate']
-                })
+                alerts.append(AlertRecord(PRODUCTION_LOW, machine, machine_status['production_rate'],
+                                          self.thresholds['production_low'], now))
 
             # Efficiency alerts
             if machine_status['efficiency'] < self.thresholds['efficiency_low']:
-                alerts.append({
-                    'severity': 'Major',
-                    'title': 'Low Machine Efficiency',
-                    'message': f"Machine efficiency is {machine_status['efficiency']:.1f}%, below acceptable threshold of {self.thresholds['efficiency_low']}%",
-                    'machine': machine,
-                    'timestamp': datetime.now().strftime("%H:%M:%S"),
-                    'metric': 'Efficiency',
-                    'value': machine_status['efficiency']
-                })
+                alerts.append(AlertRecord(EFFICIENCY_LOW, machine, machine_status['efficiency'],
+                                          self.thresholds['efficiency_low'], now))
 
             # Machine error status
             if machine_status['status'] == 'Error':
-                alerts.append({
-                    'severity': 'Critical',
-                    'title': 'Machine Error Status',
-                    'message': f"Machine is in error state and requires immediate attention",
-                    'machine': machine,
-                    'timestamp': datetime.now().strftime("%H:%M:%S"),
-                    'metric': 'Status',
-                    'value': machine_status['status']
-                })
+                alerts.append(AlertRecord(MACHINE_ERROR, machine, created_at=now))
 
         # Randomly generate some alerts to simulate real conditions
         if random.random() < 0.3:  # 30% chance of additional alert
-            sample_alerts = [
-                {
-                    'severity': 'Warning',
-                    'title': 'Material Low',
-                    'message': 'Raw material inventory is running low for Line-A',
-                    'machine': 'Line-A-Press-01',
-                    'timestamp': datetime.now().strftime("%H:%M:%S"),
-                    'metric': 'Inventory',
-                    'value': 'Low'
-                },
-                {
-                    'severity': 'Info',
-                    'title': 'Planned Maintenance Due',
-                    'message': 'Scheduled maintenance window approaching in 2 hours',
-                    'machine': 'Line-B-Welding-03',
-                    'timestamp': datetime.now().strftime("%H:%M:%S"),
-                    'metric': 'Maintenance',
-                    'value': 'Due'
-                },
-                {
-                    'severity': 'Major',
-                    'title': 'Quality Check Required',
-                    'message': 'Quality parameters showing deviation from specification',
-                    'machine': 'Quality-Station-06',
-                    'timestamp': datetime.now().strftime("%H:%M:%S"),
-                    'metric': 'Quality',
-                    'value': 'Deviation'
-                }
-            ]
-            alerts.append(random.choice(sample_alerts))
-
-        # Store in history
-        for alert in alerts:
-            self.alert_history.append({
-                **alert,
-                'created_at': datetime.now()
-            })
+            kind, machine = random.choice([
+                (MATERIAL_LOW, 'Line-A-Press-01'),
+                (MAINTENANCE_DUE, 'Line-B-Welding-03'),
+                (QUALITY_DEVIATION, 'Quality-Station-06')
+            ])
+            alerts.append(AlertRecord(kind, machine, created_at=now))
+
+        # Store in history, records are shared rather than copied
+        self.alert_history.extend(alerts)
 
         # Keep only recent alerts (last 24 hours)
-        cutoff_time = datetime.now() - timedelta(hours=24)
-        self.alert_history = [alert for alert in self.alert_history if alert['created_at'] > cutoff_time]
+        self._trim_history(now - 24 * 3600)
+
+        return alerts
 
+    def check_maintenance_alerts(self, scores):
+        """Raise alerts for machines whose predicted failure risk has crossed above the threshold
+
+        scores is the DataFrame returned by MaintenancePredictor.score, indexed by machine.
+        A machine alerts once when it crosses and again only after dropping back below.
+        """
+        now = time.time()
+        threshold = self.thresholds['maintenance_risk_high']
+        at_risk = scores[scores['risk'] > threshold]
+        alerts = [AlertRecord(MAINTENANCE_RISK, machine, risk, threshold, now)
+                  for machine, risk in zip(at_risk.index, at_risk['risk'])
+                  if machine not in self.maintenance_at_risk]
+        self.maintenance_at_risk = set(at_risk.index)
+
+        self.alert_history.extend(alerts)
         return alerts
 
+    def _trim_history(self, cutoff):
+        """Drop alerts created before the cutoff epoch, relying on history being time ordered"""
+        expired = 0
+        for alert in self.alert_history:
+            if alert.created_at > cutoff:
+                break
+            expired += 1
+        if expired:
+            del self.alert_history[:expired]
+
     def get_alert_history(self, hours=24):
         """Get alert history for the specified number of hours"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        return [alert for alert in self.alert_history if alert['created_at'] > cutoff_time]
+        cutoff = time.time() - hours * 3600
+        return [alert for alert in self.alert_history if alert.created_at > cutoff]
 
     def get_alert_summary(self):
         """Get summary of alerts by severity"""
-        recent_alerts = self.get_alert_history(24)
-        
-        summary = {
-            'Critical': len([a for a in recent_alerts if a['severity'] == 'Critical']),
-            'Major': len([a for a in recent_alerts if a['severity'] == 'Major']),
-            'Warning': len([a for a in recent_alerts if a['severity'] == 'Warning']),
-            'Info': len([a for a in recent_alerts if a['severity'] == 'Info'])
-        }
-        
+        summary = {severity: 0 for severity in SEVERITIES}
+        for alert in self.get_alert_history(24):
+            summary[alert.severity] += 1
+
         return summary
 
     def acknowledge_alert(self, alert_id):
@@ -181,6 +284,7 @@ class AlertSystem:
     def clear_alerts(self, machine=None):
         """Clear alerts for a specific machine or all alerts"""
         if machine:
-            self.alert_history = [alert for alert in self.alert_history if alert['machine'] != machine]
+            code = machine_code(machine)
+            self.alert_history = [alert for alert in self.alert_history if alert.machine_code != code]
         else:
             self.alert_history = []
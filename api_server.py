@@ -0,0 +1,302 @@
+import json
+import time
+import zlib
+import argparse
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+import pandas as pd
+from alert_scheduler import alert_payload
+from compression import TelemetryHistory, METRICS
+
+DEFAULT_API_PORT = 8502
+MAX_CACHED_RESPONSES = 1024
+
+
+def _jsonable(record):
+    """Copy a generator record with datetimes as ISO strings and NumPy scalars as Python numbers"""
+    result = {}
+    for key, value in record.items():
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, np.generic):
+            value = value.item()
+        result[key] = value
+    return result
+
+
+def _changed(old, new):
+    """Whether a record changed, ignoring its last_update stamp"""
+    if old is None:
+        return True
+    return {k: v for k, v in old.items() if k != 'last_update'} != {k: v for k, v in new.items() if k != 'last_update'}
+
+
+class LiveState:
+    """Versioned snapshot of the live KPIs, fleet status, alerts and recent readings
+
+    Every change bumps one global version and is stamped with it: the KPIs, each
+    machine, each alert and each refresh of the readings history. "Changes since
+    version N" is then a comparison against those stamps, and each rendered response is
+    cached until its resource changes, so repeated polls cost a dictionary lookup.
+    It doubles as an alert sink, so the alert scheduler pushes alerts in as they are raised.
+    """
+
+    def __init__(self, data_generator, interval_seconds=5, history_hours=8, max_alerts=1000):
+        self.data_generator = data_generator
+        self.machines = list(data_generator.get_machine_list())
+        self.interval_seconds = interval_seconds
+        self.history_hours = history_hours
+
+        self.version = 0
+        self.kpis, self.kpis_version = {}, 0
+        self.fleet, self.machine_versions = {}, {}
+        self.active_alerts, self.active_version = [], 0
+        self.alert_log = deque(maxlen=max_alerts)  # (version, alert payload), oldest first
+        self.alerts_version = 0
+
+        self.history = TelemetryHistory(block_rows=240)
+        self.history_version = 0
+        self._refresh_times = deque(maxlen=history_hours * 3600 // max(1, int(interval_seconds)) + 1)
+        self.last_refresh = None
+
+        self._responses = {}  # (path, query) -> (resource version, etag, body)
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Warm up the readings history and start the refresh thread if it is not already running"""
+        if self.is_running():
+            return
+        if self.history_version == 0:
+            end = datetime.now().replace(second=0, microsecond=0)
+            with self._lock:
+                for chunk in self.data_generator.iter_telemetry(end - timedelta(hours=self.history_hours), end,
+                                                                machines=self.machines):
+                    self.history.append(chunk)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="api-live-state", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the refresh thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.refresh()
+            if self._stop_event.wait(self.interval_seconds):
+                break
+
+    def refresh(self):
+        """Take a new KPI and fleet snapshot and stamp whatever changed with a new version"""
+        now = datetime.now()
+        kpis = _jsonable(self.data_generator.generate_current_data())
+        statuses = {machine: self.data_generator.generate_machine_status(machine) for machine in self.machines}
+        readings = pd.DataFrame([{'timestamp': now, 'machine': machine, **status}
+                                 for machine, status in statuses.items()])
+
+        with self._lock:
+            self.version += 1
+            if kpis != self.kpis:
+                self.kpis, self.kpis_version = kpis, self.version
+            for machine, status in statuses.items():
+                status = _jsonable(status)
+                if _changed(self.fleet.get(machine), status):
+                    self.machine_versions[machine] = self.version
+                self.fleet[machine] = status
+            self.history.append(readings[['timestamp', 'machine', 'status'] + METRICS])
+            self.history.drop_before(now - timedelta(hours=self.history_hours))
+            self.history_version = self.version
+            self._refresh_times.append((self.version, now))
+            self.last_refresh = now
+
+    def send(self, alerts):
+        """Alert sink interface: record the alerts of one scheduler evaluation"""
+        payloads = [alert_payload(alert) for alert in alerts]
+        with self._lock:
+            if not payloads and not self.active_alerts:
+                return
+            self.version += 1
+            self.active_alerts, self.active_version = payloads, self.version
+            self.alert_log.extend((self.version, payload) for payload in payloads)
+            if payloads:
+                self.alerts_version = self.version
+
+    def resource_version(self, path):
+        """Version at which the resource behind an API path last changed"""
+        return {
+            '/api/kpis': self.kpis_version,
+            '/api/fleet': max(self.machine_versions.values(), default=0),
+            '/api/alerts': max(self.active_version, self.alerts_version),
+            '/api/timeseries': self.history_version
+        }.get(path)
+
+    def render(self, path, params):
+        """Render an API response as a JSON-serialisable dict; raises KeyError or ValueError on bad requests"""
+        since = int(params['since']) if 'since' in params else None
+
+        if path == '/api/version':
+            return {'version': self.version}
+
+        if path == '/api/kpis':
+            return {'version': self.kpis_version, 'kpis': self.kpis}
+
+        if path == '/api/fleet':
+            changed = [m for m in self.machines if since is None or self.machine_versions.get(m, 0) > since]
+            return {'version': self.version, 'since': since, 'full': since is None,
+                    'machines': {machine: self.fleet[machine] for machine in changed if machine in self.fleet}}
+
+        if path == '/api/alerts':
+            if since is None:
+                return {'version': self.version, 'alerts': self.active_alerts}
+            # A client further behind than the retained log gets everything that is left
+            complete = not self.alert_log or self.alert_log[0][0] <= since + 1 or len(self.alert_log) < self.alert_log.maxlen
+            return {'version': self.version, 'since': since, 'complete': complete,
+                    'alerts': [payload for version, payload in self.alert_log if version > since]}
+
+        if path == '/api/timeseries':
+            machine = params['machine']
+            if machine not in self.machines:
+                raise ValueError(f"Unknown machine: {machine}")
+            metrics = params['metric'].split(',') if 'metric' in params else METRICS
+            unknown = set(metrics) - set(METRICS)
+            if unknown:
+                raise ValueError(f"Unknown metrics: {', '.join(sorted(unknown))}")
+            # Windows are anchored on the latest refresh, so a response only changes with the data
+            end = self.last_refresh or datetime.now()
+            start = end - timedelta(minutes=int(params.get('minutes', 60)))
+            if since is not None:
+                refreshed = [when for version, when in self._refresh_times if version <= since]
+                start = max(start, refreshed[-1] + timedelta(microseconds=1)) if refreshed else start
+            frame = self.history.read(machine, start, end + timedelta(microseconds=1), metrics)
+            return {
+                'version': self.history_version, 'since': since, 'machine': machine,
+                'timestamps': [t.isoformat() for t in frame['timestamp']],
+                **{metric: frame[metric].round(3).tolist() for metric in metrics}
+            }
+
+        raise KeyError(path)
+
+    def respond(self, path, query):
+        """Return (etag, body bytes) for a request, reusing the cached body while the resource is unchanged"""
+        with self._lock:
+            version = self.resource_version(path)
+            cached = self._responses.get((path, query))
+            if cached is not None and version is not None and cached[0] == version:
+                return cached[1], cached[2]
+
+            params = {key: values[-1] for key, values in parse_qs(query).items()}
+            body = json.dumps(self.render(path, params), separators=(',', ':')).encode()
+            etag = f'"{zlib.crc32(body):08x}-{len(body)}"'
+            if version is not None:
+                if len(self._responses) >= MAX_CACHED_RESPONSES:
+                    self._responses.clear()
+                self._responses[(path, query)] = (version, etag, body)
+            return etag, body
+
+
+class ApiServer:
+    """Local HTTP JSON API over a LiveState, with ETag / If-None-Match support
+
+    Endpoints: /api/version, /api/kpis, /api/fleet, /api/alerts and
+    /api/timeseries?machine=...&metric=...&minutes=...; fleet, alerts and timeseries
+    accept ?since=N to return only what changed after version N.
+    """
+
+    def __init__(self, state, host="127.0.0.1", port=DEFAULT_API_PORT):
+        self.state = state
+        self.requests = 0
+        self.not_modified = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                url = urlsplit(self.path)
+                try:
+                    etag, body = state.respond(url.path, url.query)
+                except KeyError as error:
+                    status = 404 if error.args and error.args[0] == url.path else 400
+                    return self._send_json(status, {'error': f"Not found: {url.path}" if status == 404
+                                                    else f"Missing parameter: {error.args[0]}"})
+                except ValueError as error:
+                    return self._send_json(400, {'error': str(error)})
+
+                if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+                    server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self._send_json(200, body, etag)
+
+            def _send_json(self, status, body, etag=None):
+                if not isinstance(body, bytes):
+                    body = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Cache-Control', 'no-cache')
+                if etag:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="api-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    from data_generator import ManufacturingDataGenerator
+    from alert_system import AlertSystem
+    from alert_scheduler import AlertScheduler
+
+    parser = argparse.ArgumentParser(description="Serve live KPIs, fleet status, alerts and readings as JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_API_PORT)
+    parser.add_argument("--interval", type=float, default=5, help="Seconds between snapshots")
+    args = parser.parse_args()
+
+    data_generator = ManufacturingDataGenerator()
+    state = LiveState(data_generator, interval_seconds=args.interval)
+    scheduler = AlertScheduler(AlertSystem(), data_generator, interval_seconds=10, sinks=[state])
+    state.start()
+    scheduler.start()
+    server = ApiServer(state, args.host, args.port).start()
+    print(f"Serving on {server.url}/api/")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"{server.requests} requests, {server.not_modified} not modified, version {state.version}")
+    except KeyboardInterrupt:
+        server.stop()
+        scheduler.stop()
+        state.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,21 @@ import numpy as np
 from datetime import datetime, timedelta
 import time
 import json
-from data_generator import ManufacturingDataGenerator
-from alert_system import AlertSystem
-from utils import format_percentage, format_number, get_status_color
+import os
+import argparse
+from data_generator import ManufacturingDataGenerator, CYCLE_VERDICTS
+from alert_system import AlertSystem, SEVERITIES
+from alert_scheduler import AlertScheduler, JsonlFileSink, WebhookSink
+from export import EXPORT_FORMATS, export_dataset, ShiftReportScheduler
+from query_cache import QueryCache, cached_daily_query
+from cycle_stats import CycleStatistics, QUANTILES
+from correlation_engine import CorrelationEngine
+from maintenance import MaintenancePredictor
+from backtest import ThresholdBacktester
+from storage import TelemetryStore, DEFAULT_STORE_DIR
+from federation import PlantRollup, RollupPublisher, load_rollups
+from api_server import LiveState, ApiServer, DEFAULT_API_PORT
+from utils import format_percentage, format_number, get_status_color, get_machine_line, get_shift_info
 
 # Configure page
 st.set_page_config(
@@ -19,14 +31,92 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+EXPORT_DOWNLOAD_LIMIT_MB = 200
+
+# Command line options, passed after `--`: streamlit run app.py -- --aggregate DIR [DIR ...]
+parser = argparse.ArgumentParser()
+parser.add_argument("--plant", default=os.environ.get("PLANT_NAME", "Plant"), help="This instance's plant name")
+parser.add_argument("--publish", metavar="DIR", help="Publish this instance's rollup into DIR for federation")
+parser.add_argument("--aggregate", nargs="+", metavar="SOURCE",
+                    help="Run as a federation aggregator over rollup directories or files")
+parser.add_argument("--api-port", type=int, default=int(os.environ.get("DASHBOARD_API_PORT", DEFAULT_API_PORT)),
+                    help="Port for the local JSON API, 0 to disable")
+app_args, _ = parser.parse_known_args()
+
 # Initialize session state
 if 'data_generator' not in st.session_state:
     st.session_state.data_generator = ManufacturingDataGenerator()
-if 'alert_system' not in st.session_state:
-    st.session_state.alert_system = AlertSystem()
 if 'last_update' not in st.session_state:
     st.session_state.last_update = datetime.now()
 
+@st.cache_resource
+def get_report_scheduler(_data_generator, _alert_system):
+    """Single shift report scheduler shared by all sessions"""
+    return ShiftReportScheduler("reports", _data_generator, _alert_system)
+
+@st.cache_resource
+def get_query_cache():
+    """Historical query cache shared by all sessions"""
+    return QueryCache()
+
+@st.cache_resource
+def get_cycle_statistics():
+    """Streaming cycle-time percentiles shared by all sessions"""
+    return CycleStatistics()
+
+@st.cache_resource
+def get_correlation_engine(machines):
+    """Rolling cross-machine correlations shared by all sessions"""
+    return CorrelationEngine(machines)
+
+@st.cache_resource
+def get_maintenance_predictor(machines):
+    """Incremental maintenance features and risk scoring shared by all sessions"""
+    return MaintenancePredictor(machines)
+
+@st.cache_resource(ttl=3600)
+def get_threshold_backtester(_data_generator, days=28):
+    """Threshold backtester over the last weeks of stored (or else simulated) readings"""
+    store = TelemetryStore(DEFAULT_STORE_DIR)
+    if store.days('telemetry'):
+        end_date = datetime.now().date()
+        return ThresholdBacktester.from_store(store, end_date - timedelta(days=days), end_date,
+                                              _data_generator.get_machine_list())
+    return ThresholdBacktester.from_generator(_data_generator, days)
+
+@st.cache_resource
+def get_alert_scheduler():
+    """Single background alert evaluator shared by all sessions, so page views never re-run the checks"""
+    data_generator = ManufacturingDataGenerator()
+    sinks = [JsonlFileSink(os.path.join("logs", "alerts.jsonl"))]
+    if os.environ.get("ALERT_WEBHOOK_URL"):
+        sinks.append(WebhookSink(os.environ["ALERT_WEBHOOK_URL"]))
+    scheduler = AlertScheduler(AlertSystem(), data_generator, interval_seconds=10, sinks=sinks,
+                               maintenance_predictor=get_maintenance_predictor(tuple(data_generator.get_machine_list())))
+    scheduler.start()
+    return scheduler
+
+@st.cache_resource
+def get_rollup_publisher(directory, plant):
+    """Single federation rollup publisher for this instance"""
+    alert_scheduler = get_alert_scheduler()
+    publisher = RollupPublisher(directory, plant, alert_scheduler.data_generator, alert_scheduler.alert_system)
+    publisher.start()
+    return publisher
+
+@st.cache_resource
+def get_api_server(port):
+    """Local JSON API for wallboards and HMIs, fed by the shared alert scheduler's data source"""
+    alert_scheduler = get_alert_scheduler()
+    state = LiveState(alert_scheduler.data_generator)
+    try:
+        server = ApiServer(state, port=port)
+    except OSError:  # Port taken, e.g. by another instance on this host
+        return None
+    state.start()
+    alert_scheduler.add_sink(state)
+    return server.start()
+
 # Auto-refresh functionality
 refresh_interval = st.sidebar.selectbox(
     "Refresh Interval (seconds)",
@@ -37,6 +127,8 @@ refresh_interval = st.sidebar.selectbox(
 # Auto-refresh logic
 if datetime.now() - st.session_state.last_update > timedelta(seconds=refresh_interval):
     st.session_state.last_update = datetime.now()
+    # New live readings only land in today's range, older cached results stay valid
+    get_query_cache().invalidate(datetime.now().date(), datetime.now().date())
     st.rerun()
 
 # Main header with factory image
@@ -50,6 +142,68 @@ st.markdown("""
 st.title("🏭 Real-Time Manufacturing Dashboard")
 st.markdown("---")
 
+if app_args.aggregate:
+    st.header("🌐 Federated Overview")
+    
+    rollups, errors = load_rollups(app_args.aggregate)
+    for error in errors:
+        st.warning(f"Skipped rollup {error}")
+    if not rollups:
+        st.info(f"No plant rollups found in {', '.join(app_args.aggregate)}")
+        st.stop()
+    rollups.sort(key=lambda rollup: rollup.plants[0])
+    federated = PlantRollup.combine(rollups)
+    st.caption(f"{len(rollups)} plants, {federated.start.strftime('%Y-%m-%d %H:%M')} to "
+               f"{federated.end.strftime('%Y-%m-%d %H:%M')}, oldest rollup published "
+               f"{federated.generated_at.strftime('%H:%M:%S')}")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Federated OEE", format_percentage(federated.oee))
+    with col2:
+        st.metric("Availability / Performance / Quality",
+                  f"{federated.availability:.0f}% / {federated.performance:.0f}% / {federated.quality:.0f}%")
+    with col3:
+        st.metric("Downtime (minutes)", format_number(sum(federated.downtime_minutes.values())))
+    with col4:
+        st.metric("Alerts", format_number(sum(federated.alerts.values())),
+                  delta=f"{federated.alerts.get('Critical', 0)} critical", delta_color="inverse")
+    
+    st.subheader("Plants")
+    st.dataframe(pd.DataFrame([{
+        'Plant': rollup.plants[0],
+        'OEE': f"{rollup.oee:.1f}%",
+        'Availability': f"{rollup.availability:.1f}%",
+        'Performance': f"{rollup.performance:.1f}%",
+        'Quality': f"{rollup.quality:.1f}%",
+        'Downtime (min)': sum(rollup.downtime_minutes.values()),
+        **{severity: rollup.alerts.get(severity, 0) for severity in SEVERITIES},
+        'Published': rollup.generated_at.strftime("%H:%M:%S")
+    } for rollup in rollups]), use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        downtime = pd.DataFrame([
+            {'Plant': rollup.plants[0], 'Reason': reason, 'Minutes': minutes}
+            for rollup in rollups for reason, minutes in rollup.downtime_minutes.items()
+        ])
+        if not downtime.empty:
+            fig = px.bar(downtime, x='Reason', y='Minutes', color='Plant', title="Downtime by Reason")
+            st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        alert_counts = pd.DataFrame([
+            {'Plant': rollup.plants[0], 'Severity': severity, 'Alerts': rollup.alerts.get(severity, 0)}
+            for rollup in rollups for severity in SEVERITIES
+        ])
+        fig = px.bar(alert_counts, x='Plant', y='Alerts', color='Severity', title="Alerts by Severity")
+        st.plotly_chart(fig, use_container_width=True)
+    st.stop()
+
+alert_scheduler = get_alert_scheduler()
+st.session_state.alert_system = alert_scheduler.alert_system
+rollup_publisher = get_rollup_publisher(app_args.publish, app_args.plant) if app_args.publish else None
+api_server = get_api_server(app_args.api_port) if app_args.api_port else None
+
 # Sidebar navigation
 st.sidebar.title("Dashboard Navigation")
 page = st.sidebar.selectbox(
@@ -198,6 +352,24 @@ elif page == "Machine Status":
     with col4:
         st.metric("Vibration", f"{machine_detail['vibration']:.2f}mm/s")
     
+    # Predictive maintenance
+    maintenance_scores = get_maintenance_predictor(tuple(machines)).score(st.session_state.data_generator)
+    machine_score = maintenance_scores.loc[selected_machine]
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Failure Risk", format_percentage(machine_score['risk'] * 100))
+    
+    with col2:
+        st.metric("Remaining Useful Life", f"{machine_score['remaining_useful_life_days']:.0f} days")
+    
+    with col3:
+        st.metric("Defect Rate", format_percentage(machine_score['defect_rate']))
+    
+    with col4:
+        st.metric("Error State Frequency", format_percentage(machine_score['error_frequency'] * 100))
+    
     st.markdown("---")
     
     # Machine performance charts
@@ -251,10 +423,34 @@ elif page == "Machine Status":
         
         st.plotly_chart(fig, use_container_width=True)
     
+    # Cycle time percentiles
+    st.subheader("Cycle Time Percentiles (today)")
+    cycle_statistics = get_cycle_statistics()
+    cycle_statistics.ingest_since(st.session_state.data_generator)
+    
+    shift_name, _ = get_shift_info()
+    percentile_scopes = [
+        ('machine', selected_machine),
+        ('line', get_machine_line(selected_machine)),
+        ('shift', shift_name)
+    ]
+    for col, (scope, key) in zip(st.columns(len(percentile_scopes)), percentile_scopes):
+        with col:
+            percentiles = cycle_statistics.get_percentiles(scope, key)
+            st.markdown(f"**{key}** ({cycle_statistics.get_count(scope, key):,} cycles)")
+            st.write(" | ".join(f"p{q * 100:g}: {percentiles[q]:.1f}s" for q in QUANTILES))
+    
     # Production cycles
     st.subheader("Recent Production Cycles")
     cycles_data = st.session_state.data_generator.generate_production_cycles(selected_machine)
-    df_cycles = pd.DataFrame(cycles_data)
+    df_cycles = pd.DataFrame({
+        'Cycle': [f"C{1000 + i}" for i in range(len(cycles_data))],
+        'Start Time': cycles_data['start'].dt.strftime("%H:%M:%S"),
+        'End Time': cycles_data['end'].dt.strftime("%H:%M:%S"),
+        'Cycle Time (s)': cycles_data['duration'].map("{:.1f}".format),
+        'Quality Score': cycles_data['quality'].map("{:.1f}".format),
+        'Status': [CYCLE_VERDICTS[verdict] for verdict in cycles_data['verdict']]
+    })
     st.dataframe(df_cycles, use_container_width=True)
 
 elif page == "Historical Analysis":
@@ -277,8 +473,11 @@ elif page == "Historical Analysis":
         st.subheader("Production Volume Over Time")
         
         # Generate historical production data
-        days = (end_date - start_date).days
-        historical_data = st.session_state.data_generator.generate_historical_data('production', days)
+        historical_data = cached_daily_query(
+            get_query_cache(), 'historical', 'production', None, start_date, end_date,
+            lambda start, end: st.session_state.data_generator.generate_historical_data(
+                'production', (end - start).days + 1, start_date=start)
+        )
         
         fig = go.Figure()
         fig.add_trace(go.Scatter(
@@ -310,9 +509,13 @@ elif page == "Historical Analysis":
     elif analysis_type == "Downtime Analysis":
         st.subheader("Downtime Events Analysis")
         
-        # Generate downtime events
-        downtime_events = st.session_state.data_generator.generate_downtime_events(days=(end_date - start_date).days)
-        df_downtime = pd.DataFrame(downtime_events)
+        # Generate downtime events, leaving out those today that have not started yet
+        df_downtime = cached_daily_query(
+            get_query_cache(), 'downtime', 'events', machines, start_date, end_date,
+            lambda start, end: pd.DataFrame(list(
+                st.session_state.data_generator.iter_downtime_events(start, end, machines=machines)))
+        )
+        df_downtime = df_downtime[df_downtime['start_time'] <= datetime.now()].sort_values('start_time', ascending=False)
         
         # Downtime by machine
         fig = px.bar(df_downtime, x='machine', y='duration_minutes', color='reason',
@@ -328,17 +531,21 @@ elif page == "Historical Analysis":
         st.subheader("Machine Efficiency Comparison")
         
         # Generate efficiency data for all machines
-        efficiency_data = []
-        for machine in machines:
-            eff_data = st.session_state.data_generator.generate_historical_data('efficiency', days=(end_date - start_date).days, machine=machine)
-            for i, row in eff_data.iterrows():
-                efficiency_data.append({
-                    'Date': row['date'],
+        def compute_efficiency(start, end):
+            frames = []
+            for machine in machines:
+                eff_data = st.session_state.data_generator.generate_historical_data(
+                    'efficiency', (end - start).days + 1, machine=machine, start_date=start)
+                frames.append(pd.DataFrame({
+                    'Date': eff_data['date'],
                     'Machine': machine,
-                    'Efficiency': row['value']
-                })
+                    'Efficiency': eff_data['value']
+                }))
+            return pd.concat(frames, ignore_index=True)
         
-        df_efficiency = pd.DataFrame(efficiency_data)
+        df_efficiency = cached_daily_query(
+            get_query_cache(), 'historical', 'efficiency', machines, start_date, end_date, compute_efficiency
+        )
         
         # Line chart comparing efficiency
         fig = px.line(df_efficiency, x='Date', y='Efficiency', color='Machine',
@@ -353,6 +560,46 @@ elif page == "Historical Analysis":
         fig_bar.update_layout(height=400)
         st.plotly_chart(fig_bar, use_container_width=True)
 
+    cache_stats = get_query_cache().get_stats()
+    st.caption(f"Query cache: {cache_stats['entries']} results, {cache_stats['bytes'] / 1024:.0f} KB, "
+               f"{cache_stats['hits']} hits / {cache_stats['misses']} misses")
+
+    # Data export
+    with st.expander("📥 Export Data"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            export_datasets = st.multiselect("Datasets", ["telemetry", "alerts", "downtime"], default=["telemetry"])
+        with col2:
+            export_machines = st.multiselect("Machines", machines, default=machines)
+        with col3:
+            export_format = st.selectbox("Format", EXPORT_FORMATS)
+
+        st.caption(f"Files are written to exports/ in chunks. Files up to {EXPORT_DOWNLOAD_LIMIT_MB} MB are also "
+                   "offered as a download, which loads them into memory; larger ones stay on the server only.")
+        if st.button("Export Selected Range"):
+            export_start = datetime.combine(start_date, datetime.min.time())
+            # Never export simulated readings past the current moment
+            export_end = min(datetime.combine(end_date, datetime.min.time()) + timedelta(days=1), datetime.now())
+            os.makedirs("exports", exist_ok=True)
+            if not export_machines:
+                st.warning("Select at least one machine to export")
+                export_datasets = []
+
+            for dataset in export_datasets:
+                path = os.path.join("exports", f"{dataset}_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{export_format}")
+                if os.path.exists(path):
+                    os.remove(path)  # An empty Parquet export writes no file, so never offer a stale one
+                rows = export_dataset(dataset, path, export_start, export_end,
+                                      st.session_state.data_generator, st.session_state.alert_system,
+                                      machines=export_machines, fmt=export_format)
+                if not os.path.exists(path):
+                    st.info(f"No {dataset} rows in the selected range")
+                elif os.path.getsize(path) > EXPORT_DOWNLOAD_LIMIT_MB * 2**20:
+                    st.info(f"{dataset}: {rows:,} rows written to {path}")
+                else:
+                    with open(path, 'rb') as f:
+                        st.download_button(f"Download {dataset} ({rows:,} rows)", f, file_name=os.path.basename(path))
+
 elif page == "Alerts & Settings":
     st.header("🚨 Alert System & Settings")
     
@@ -384,24 +631,66 @@ elif page == "Alerts & Settings":
             'production_low': prod_low,
             'efficiency_low': eff_low
         })
-        st.success("Alert thresholds updated successfully!")
+        st.success("Alert thresholds updated successfully! They apply from the next scheduled evaluation.")
+    
+    # What-if backtest of the thresholds entered above
+    st.write("**Threshold Backtest**")
+    backtester = get_threshold_backtester(st.session_state.data_generator)
+    current_thresholds = st.session_state.alert_system.thresholds
+    candidate_thresholds = {
+        **current_thresholds,
+        'temp_high': temp_high,
+        'temp_low': temp_low,
+        'vibration_high': vib_high,
+        'production_low': prod_low,
+        'efficiency_low': eff_low
+    }
+    st.caption(f"Alerts per day these thresholds would have raised over the last {len(backtester.days)} days "
+               f"({backtester.readings:,} readings), compared with the current thresholds")
+    
+    candidate_rate = backtester.daily_rate(candidate_thresholds)
+    current_rate = backtester.daily_rate(current_thresholds)
+    for col, severity in zip(st.columns(len(SEVERITIES)), SEVERITIES):
+        with col:
+            st.metric(f"{severity} / day", f"{candidate_rate[severity]:.0f}",
+                      delta=f"{candidate_rate[severity] - current_rate[severity]:+.0f}", delta_color="inverse")
+    
+    backtest_counts = backtester.run(candidate_thresholds)
+    per_machine = backtest_counts.groupby(['machine', 'severity'], as_index=False)['alerts'].sum()
+    per_machine['alerts'] = per_machine['alerts'] / max(1, len(backtester.days))
+    fig = px.bar(per_machine, x='machine', y='alerts', color='severity',
+                 title="Backtested Alerts per Day by Machine")
+    fig.update_layout(height=400, yaxis_title="Alerts / day")
+    st.plotly_chart(fig, use_container_width=True)
     
     st.markdown("---")
     
     # Active alerts
     st.subheader("🔔 Active Alerts")
     
-    # Check for alerts based on current data
-    alerts = st.session_state.alert_system.check_alerts(current_data, machines, st.session_state.data_generator)
+    # Alerts from the background scheduler's most recent evaluation
+    alerts = alert_scheduler.feed.latest
+    if alert_scheduler.last_evaluation:
+        st.caption(f"Evaluated every {alert_scheduler.interval_seconds}s in the background, "
+                   f"last at {alert_scheduler.last_evaluation.strftime('%H:%M:%S')}")
     
     if alerts:
+        correlation_engine = get_correlation_engine(tuple(machines))
+        correlation_engine.ingest_since(st.session_state.data_generator)
+        
         for alert in alerts:
             alert_color = "red" if alert['severity'] == "Critical" else "orange" if alert['severity'] == "Warning" else "blue"
+            hints = correlation_engine.explain_alert(alert)
+            hint_text = " | ".join(
+                f"{hint['machine']} {hint['metric'].replace('_', ' ')} (r={hint['correlation']:+.2f}, {hint['lag_minutes']:+d} min)"
+                for hint in hints
+            )
             st.markdown(f"""
             <div style="padding: 1rem; border-left: 5px solid {alert_color}; background-color: rgba(255,0,0,0.1); margin: 0.5rem 0;">
                 <strong>{alert['severity']}: {alert['title']}</strong><br>
                 {alert['message']}<br>
                 <small>Machine: {alert['machine']} | Time: {alert['timestamp']}</small>
+                {f'<br><small>Correlated signals: {hint_text}</small>' if hint_text else ''}
             </div>
             """, unsafe_allow_html=True)
     else:
@@ -409,16 +698,56 @@ elif page == "Alerts & Settings":
     
     st.markdown("---")
     
+    # Scheduled reports
+    st.subheader("🗂️ Scheduled Shift Reports")
+    
+    report_scheduler = get_report_scheduler(st.session_state.data_generator, st.session_state.alert_system)
+    if st.checkbox("Write end-of-shift reports to the reports/ directory", value=report_scheduler.is_running()):
+        report_scheduler.start()
+    else:
+        report_scheduler.stop()
+    
+    if report_scheduler.last_report:
+        st.caption(f"Last report: {report_scheduler.last_report['shift']} ending "
+                   f"{report_scheduler.last_report['end'].strftime('%Y-%m-%d %H:%M')}")
+    if report_scheduler.report_error:
+        st.error(f"{report_scheduler.failed_reports} shift reports failed, last: {report_scheduler.report_error}")
+    
+    st.markdown("---")
+    
     # System status
     st.subheader("🔧 System Status")
     
-    col1, col2, col3 = st.columns(3)
+    latency = alert_scheduler.get_latency_stats()
+    col1, col2, col3, col4 = st.columns(4)
     with col1:
         st.metric("Data Sources", "5/5 Connected", delta="All Online")
     with col2:
         st.metric("Last Data Update", st.session_state.last_update.strftime("%H:%M:%S"))
     with col3:
-        st.metric("Alert System", "Active", delta="Monitoring")
+        st.metric("Alert System", "Active" if alert_scheduler.is_running() else "Stopped",
+                  delta=f"{latency['evaluations']} evaluations")
+    with col4:
+        st.metric("Detection Latency (p95)",
+                  f"{latency['p95'] * 1000:.0f} ms" if latency['alerts'] else "n/a",
+                  help=f"Reading to sink delivery. Worst case including the {alert_scheduler.interval_seconds}s cadence: "
+                       f"{latency['worst_case']:.1f}s")
+    
+    if api_server:
+        st.caption(f"JSON API at {api_server.url}/api/ (kpis, fleet, alerts, timeseries): "
+                   f"{api_server.requests:,} requests, {api_server.not_modified:,} answered 304 Not Modified")
+    
+    if alert_scheduler.evaluation_error:
+        st.error(f"{alert_scheduler.failed_evaluations} alert evaluations failed, "
+                 f"last: {alert_scheduler.evaluation_error}")
+    if alert_scheduler.maintenance_error:
+        st.warning(f"{alert_scheduler.failed_maintenance} maintenance risk scorings failed, "
+                   f"last: {alert_scheduler.maintenance_error}")
+    if rollup_publisher and rollup_publisher.publish_error:
+        st.warning(f"{rollup_publisher.failed_publishes} federation rollup publishes failed, "
+                   f"last: {rollup_publisher.publish_error}")
+    for sink, error in alert_scheduler.sink_errors.items():
+        st.warning(f"Alert sink {sink} failed: {error}")
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,115 @@
+import os
+import time
+import random
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import pandas as pd
+from data_generator import ManufacturingDataGenerator
+from alert_system import AlertSystem, evaluate_readings
+from storage import TelemetryStore
+
+
+def build_fleet(size):
+    """Create a data generator with `size` machines modelled on the six standard stations"""
+    data_generator = ManufacturingDataGenerator()
+    templates = list(data_generator.machines)
+    configs = {}
+
+    for i in range(size):
+        template = templates[i % len(templates)]
+        name = f"{template.rsplit('-', 1)[0]}-{i + 1:02d}"
+        configs[name] = dict(data_generator.machine_configs[template])
+
+    data_generator.machines = list(configs)
+    data_generator.machine_configs = configs
+    return data_generator
+
+
+def simulate_day(day, fleet_size, interval_minutes, cycles_per_hour, seed):
+    """Synthesise one day of every table for the fleet, run inside a worker process"""
+    data_generator = build_fleet(fleet_size)
+    random.seed(seed)
+
+    start = datetime.combine(day, datetime.min.time())
+    end = start + timedelta(days=1)
+
+    telemetry = pd.concat(list(data_generator.iter_telemetry(
+        start, end, interval_minutes=interval_minutes, chunk_rows=10 ** 6, seed=seed)), ignore_index=True)
+    # Draw each machine's events separately so downtime scales with the fleet size
+    downtime = pd.DataFrame([event for machine in data_generator.machines
+                             for event in data_generator.iter_downtime_events(day, day, machines=[machine])])
+    if not downtime.empty:
+        downtime = downtime.sort_values('start_time', kind='stable', ignore_index=True)
+    cycles = data_generator.generate_cycle_events(start, end, cycles_per_hour=cycles_per_hour, seed=seed)
+    alerts = evaluate_readings(telemetry, AlertSystem().thresholds)
+
+    return {'telemetry': telemetry, 'downtime': downtime, 'cycles': cycles, 'alerts': alerts}
+
+
+def backfill(store, start_date, end_date, fleet_size=6, interval_minutes=1, cycles_per_hour=4,
+             workers=None, seed=0, progress=None):
+    """Backfill every day in [start_date, end_date) into the store using a process pool
+
+    Days are simulated in parallel and written by this process in day order. At most
+    two days per worker are in flight, so finished days never pile up in memory when
+    writing falls behind. Returns the per-table row counts and elapsed seconds.
+    """
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days)]
+    rows = {}
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        window = 2 * (workers or os.cpu_count() or 1)
+        pending = deque()
+        remaining = iter(days)
+
+        def submit_next():
+            day = next(remaining, None)
+            if day is not None:
+                pending.append((day, executor.submit(simulate_day, day, fleet_size, interval_minutes,
+                                                     cycles_per_hour, seed + day.toordinal())))
+
+        for _ in range(window):
+            submit_next()
+        while pending:
+            day, future = pending.popleft()
+            tables = future.result()
+            submit_next()
+            for table, frame in tables.items():
+                rows[table] = rows.get(table, 0) + store.append(table, frame)
+            if progress:
+                progress(day, rows, time.perf_counter() - started)
+
+    return rows, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill months of simulated manufacturing history")
+    parser.add_argument("store", help="Storage directory to write into")
+    parser.add_argument("--months", type=int, default=1, help="Months of history to backfill, ending yesterday")
+    parser.add_argument("--machines", type=int, default=6, help="Fleet size")
+    parser.add_argument("--interval", type=int, default=1, help="Telemetry interval in minutes")
+    parser.add_argument("--cycles-per-hour", type=float, default=4, help="Production cycles per machine and hour")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes, defaults to CPU count")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=30 * args.months)
+
+    def report(day, rows, elapsed):
+        total = sum(rows.values())
+        print(f"{day}: {total:,} rows, {total / elapsed:,.0f} rows/s")
+
+    rows, elapsed = backfill(TelemetryStore(args.store), start_date, end_date, args.machines, args.interval,
+                             args.cycles_per_hour, args.workers, args.seed, progress=report)
+
+    for table, count in rows.items():
+        print(f"{table}: {count:,} rows")
+    print(f"Total: {sum(rows.values()):,} rows in {elapsed:.1f}s ({sum(rows.values()) / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
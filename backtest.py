@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from alert_system import (ALERT_KINDS, SEVERITIES, TEMP_HIGH, TEMP_LOW, VIBRATION_HIGH,
+                          PRODUCTION_LOW, EFFICIENCY_LOW, MACHINE_ERROR)
+
+# (alert kind, telemetry column, threshold key, whether readings above or below the threshold alert)
+RULES = [
+    (TEMP_HIGH, 'temperature', 'temp_high', 'above'),
+    (TEMP_LOW, 'temperature', 'temp_low', 'below'),
+    (VIBRATION_HIGH, 'vibration', 'vibration_high', 'above'),
+    (PRODUCTION_LOW, 'production_rate', 'production_low', 'below'),
+    (EFFICIENCY_LOW, 'efficiency', 'efficiency_low', 'below')
+]
+
+
+class ThresholdBacktester:
+    """Replays stored readings against candidate thresholds to count the alerts they would raise
+
+    Readings are loaded once and each metric is sorted within every (machine, day) group.
+    Counting the readings past a threshold is then a single searchsorted over all groups,
+    so a new set of thresholds is evaluated in milliseconds regardless of history length.
+    """
+
+    def __init__(self, chunks, machines):
+        self.machines = list(machines)
+        machine_codes, day_numbers, metrics, errors = [], [], {rule[1]: [] for rule in RULES}, []
+
+        for chunk in chunks:
+            codes = pd.Categorical(chunk['machine'], categories=self.machines).codes
+            keep = codes >= 0
+            machine_codes.append(codes[keep].astype(np.int32))
+            day_numbers.append(chunk['timestamp'].to_numpy()[keep].astype('datetime64[D]').astype(np.int64))
+            for column in metrics:
+                metrics[column].append(chunk[column].to_numpy(dtype=float)[keep])
+            errors.append(chunk['status'].to_numpy()[keep] == 'Error')
+
+        machine_codes = np.concatenate(machine_codes) if machine_codes else np.zeros(0, np.int32)
+        day_numbers = np.concatenate(day_numbers) if day_numbers else np.zeros(0, np.int64)
+        errors = np.concatenate(errors) if errors else np.zeros(0, bool)
+
+        first_day = day_numbers.min() if len(day_numbers) else 0
+        n_days = int(day_numbers.max() - first_day + 1) if len(day_numbers) else 0
+        self.days = np.arange(first_day, first_day + n_days).astype('datetime64[D]')
+        self.readings = len(day_numbers)
+
+        groups = machine_codes.astype(np.int64) * n_days + (day_numbers - first_day)
+        self.n_groups = len(self.machines) * n_days
+        self._group_ids = np.arange(self.n_groups)
+        self.error_counts = np.bincount(groups[errors], minlength=self.n_groups)
+
+        # Per metric: readings sorted by (group, value), encoded as group * span + offset value
+        self._sorted = {}
+        for column, parts in metrics.items():
+            values = np.concatenate(parts) if parts else np.zeros(0)
+            valid = ~np.isnan(values)
+            values = values[valid]
+            low, high = (values.min(), values.max()) if len(values) else (0.0, 0.0)
+            span = high - low + 2
+            keys = np.sort(groups[valid] * span + (values - low))
+            starts = np.searchsorted(keys, self._group_ids * span - 0.5)
+            ends = np.searchsorted(keys, (self._group_ids + 1) * span - 0.5)
+            self._sorted[column] = (keys, low, high, span, starts, ends)
+
+    @classmethod
+    def from_store(cls, store, start_date, end_date, machines):
+        """Load readings for an inclusive date range from a TelemetryStore"""
+        return cls(store.iter_chunks('telemetry', start_date, end_date, machines), machines)
+
+    @classmethod
+    def from_generator(cls, data_generator, days=28):
+        """Synthesise the last `days` days of readings with the data generator"""
+        end = datetime.combine(datetime.now().date(), datetime.min.time())
+        return cls(data_generator.iter_telemetry(end - timedelta(days=days), end), data_generator.machines)
+
+    def _count(self, column, threshold, direction):
+        keys, low, high, span, starts, ends = self._sorted[column]
+        offset = min(max(threshold, low - 0.5), high + 0.5) - low
+        if direction == 'above':
+            return ends - np.searchsorted(keys, self._group_ids * span + offset, side='right')
+        return np.searchsorted(keys, self._group_ids * span + offset, side='left') - starts
+
+    def run(self, thresholds):
+        """Alert counts per machine, day and severity for a set of thresholds"""
+        by_severity = {severity: np.zeros(self.n_groups, np.int64) for severity in SEVERITIES}
+        for kind, column, key, direction in RULES:
+            by_severity[ALERT_KINDS[kind].severity] += self._count(column, thresholds[key], direction)
+        by_severity[ALERT_KINDS[MACHINE_ERROR].severity] += self.error_counts
+
+        frame = pd.DataFrame({
+            'machine': np.repeat(self.machines, len(self.days)),
+            'date': np.tile(self.days, len(self.machines)),
+            **by_severity
+        })
+        return frame.melt(id_vars=['machine', 'date'], var_name='severity', value_name='alerts')
+
+    def daily_rate(self, thresholds):
+        """Average alerts per day by severity across the whole fleet"""
+        counts = self.run(thresholds)
+        return (counts.groupby('severity')['alerts'].sum() / max(1, len(self.days))).reindex(SEVERITIES)
@@ -0,0 +1,304 @@
+import time
+import zlib
+import argparse
+from collections import namedtuple
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+METRICS = ['temperature', 'vibration', 'production_rate', 'efficiency']
+STATUSES = ['Running', 'Idle', 'Error', 'Maintenance', 'Offline']
+ENCODINGS = [None, 'xor', 'quantized']
+
+PackedInts = namedtuple('PackedInts', ['dtype', 'count', 'payload'])
+
+
+def _pack_ints(values, level=6):
+    """Store integers in the narrowest dtype that holds them, then zlib compress"""
+    values = np.asarray(values, dtype=np.int64)
+    dtype = np.int64
+    if len(values):
+        low, high = values.min(), values.max()
+        for candidate in (np.int8, np.int16, np.int32):
+            info = np.iinfo(candidate)
+            if info.min <= low and high <= info.max:
+                dtype = candidate
+                break
+    return PackedInts(np.dtype(dtype).str, len(values), zlib.compress(values.astype(dtype).tobytes(), level))
+
+
+def _unpack_ints(packed):
+    return np.frombuffer(zlib.decompress(packed.payload), dtype=packed.dtype).astype(np.int64)
+
+
+def encode_timestamps(timestamps):
+    """Delta-of-delta encode datetime64 timestamps; regular sampling packs down to one byte of zeros each"""
+    ticks = np.asarray(timestamps, dtype='datetime64[ns]').view(np.int64)
+    first = int(ticks[0]) if len(ticks) else 0
+    first_delta = int(ticks[1] - ticks[0]) if len(ticks) > 1 else 0
+    return first, first_delta, _pack_ints(np.diff(ticks, n=2))
+
+
+def decode_timestamps(encoded, count):
+    first, first_delta, packed = encoded
+    if count == 0:
+        return np.zeros(0, dtype='datetime64[ns]')
+    deltas = np.concatenate([[first_delta], first_delta + np.cumsum(_unpack_ints(packed))])
+    ticks = first + np.concatenate([[0], np.cumsum(deltas)])[:count]
+    return ticks.astype('datetime64[ns]')
+
+
+def encode_floats_xor(values, level=6):
+    """Gorilla-style lossless float encoding: XOR with the previous value, byte-shuffled, zlib compressed
+
+    Slowly changing series share sign, exponent and leading mantissa bits, so the XORs
+    are mostly zero bytes in their high positions; shuffling groups those bytes together.
+    """
+    bits = np.ascontiguousarray(values, dtype=np.float64).view(np.uint64)
+    xored = bits.copy()
+    xored[1:] ^= bits[:-1]
+    shuffled = xored.view(np.uint8).reshape(-1, 8).T.copy()
+    return zlib.compress(shuffled.tobytes(), level)
+
+
+def decode_floats_xor(payload, count):
+    shuffled = np.frombuffer(zlib.decompress(payload), dtype=np.uint8).reshape(8, count)
+    xored = shuffled.T.copy().view(np.uint64).ravel()
+    return np.bitwise_xor.accumulate(xored).view(np.float64)
+
+
+def encode_floats_quantized(values, precision=0.01, level=6):
+    """Lossy float encoding: round to `precision`, delta encode, pack and zlib compress"""
+    values = np.asarray(values, dtype=np.float64)
+    if not np.isfinite(values).all():
+        raise ValueError("Quantized encoding requires finite values")
+    steps = np.rint(values / precision).astype(np.int64)
+    first = int(steps[0]) if len(steps) else 0
+    return first, _pack_ints(np.diff(steps))
+
+
+def decode_floats_quantized(encoded, count, precision=0.01):
+    first, packed = encoded
+    if count == 0:
+        return np.zeros(0)
+    return (first + np.concatenate([[0], np.cumsum(_unpack_ints(packed))])) * precision
+
+
+class CompressedBlock:
+    """A sealed, compressed block of one machine's readings"""
+
+    def __init__(self, timestamps, statuses, metrics, encoding='xor', precision=0.01):
+        self.count = len(timestamps)
+        self.encoding = encoding
+        self.precision = precision
+        self.start = timestamps[0]
+        self.end = timestamps[-1]
+
+        self.timestamps = encode_timestamps(timestamps)
+        self.statuses = _pack_ints(statuses)
+        if encoding == 'xor':
+            self.metrics = {name: encode_floats_xor(values) for name, values in metrics.items()}
+        elif encoding == 'quantized':
+            self.metrics = {name: encode_floats_quantized(values, precision) for name, values in metrics.items()}
+        else:
+            raise ValueError(f"Unknown encoding: {encoding}")
+
+    def decode_metric(self, name):
+        if self.encoding == 'xor':
+            return decode_floats_xor(self.metrics[name], self.count)
+        return decode_floats_quantized(self.metrics[name], self.count, self.precision)
+
+    def decode(self):
+        """Decode the block into timestamp, status code and metric arrays"""
+        arrays = {
+            'timestamp': decode_timestamps(self.timestamps, self.count),
+            'status': _unpack_ints(self.statuses).astype(np.int8)
+        }
+        for name in self.metrics:
+            arrays[name] = self.decode_metric(name)
+        return arrays
+
+    @property
+    def nbytes(self):
+        size = len(self.timestamps[2].payload) + len(self.statuses.payload)
+        for encoded in self.metrics.values():
+            size += len(encoded) if self.encoding == 'xor' else len(encoded[1].payload)
+        return size
+
+
+class RawBlock:
+    """An uncompressed block of one machine's readings"""
+
+    def __init__(self, timestamps, statuses, metrics):
+        self.count = len(timestamps)
+        self.start = timestamps[0]
+        self.end = timestamps[-1]
+        self.arrays = {'timestamp': np.asarray(timestamps, dtype='datetime64[ns]'),
+                       'status': np.asarray(statuses, dtype=np.int8), **metrics}
+
+    def decode_metric(self, name):
+        return self.arrays[name]
+
+    def decode(self):
+        return self.arrays
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.arrays.values())
+
+
+class TelemetryHistory:
+    """In-memory per-machine telemetry history, optionally held as compressed blocks
+
+    Readings accumulate in an open buffer per machine and are sealed into blocks of
+    block_rows readings, compressed with the chosen encoding ('xor' lossless, 'quantized'
+    lossy to `precision`, or None for raw float64). Reads decode only overlapping blocks.
+    """
+
+    def __init__(self, metrics=None, block_rows=1440, encoding='xor', precision=0.01):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding: {encoding}")
+        self.metrics = list(metrics or METRICS)
+        self.block_rows = block_rows
+        self.encoding = encoding
+        self.precision = precision
+
+        self.blocks = {}   # machine -> sealed blocks, oldest first
+        self._open = {}    # machine -> list of pending reading DataFrames
+
+    def append(self, readings):
+        """Append a telemetry DataFrame (timestamp, machine, status and metric columns)"""
+        for machine, rows in readings.groupby('machine', sort=False):
+            pending = self._open.setdefault(machine, [])
+            pending.append(rows)
+            if sum(len(part) for part in pending) >= self.block_rows:
+                self._seal(machine)
+
+    def _seal(self, machine, force=False):
+        pending = pd.concat(self._open.pop(machine, []), ignore_index=True)
+        while len(pending) >= self.block_rows or (force and len(pending)):
+            block, pending = pending.iloc[:self.block_rows], pending.iloc[self.block_rows:]
+            self.blocks.setdefault(machine, []).append(self._make_block(block))
+        if len(pending):
+            self._open[machine] = [pending]
+
+    def _make_block(self, rows):
+        timestamps = rows['timestamp'].to_numpy(dtype='datetime64[ns]')
+        statuses = pd.Categorical(rows['status'], categories=STATUSES).codes
+        metrics = {name: rows[name].to_numpy(dtype=np.float64) for name in self.metrics}
+        if self.encoding is None:
+            return RawBlock(timestamps, statuses, metrics)
+        return CompressedBlock(timestamps, statuses, metrics, self.encoding, self.precision)
+
+    def flush(self):
+        """Seal every open buffer, including partial blocks"""
+        for machine in list(self._open):
+            self._seal(machine, force=True)
+
+    def drop_before(self, cutoff):
+        """Discard sealed blocks whose readings all precede cutoff, returning how many were dropped"""
+        cutoff = np.datetime64(cutoff, 'ns')
+        dropped = 0
+        for machine, blocks in self.blocks.items():
+            kept = [block for block in blocks if block.end >= cutoff]
+            dropped += len(blocks) - len(kept)
+            self.blocks[machine] = kept
+        return dropped
+
+    def read(self, machine, start=None, end=None, metrics=None):
+        """Decode a machine's readings between start and end into a DataFrame"""
+        start = np.datetime64(start, 'ns') if start is not None else None
+        end = np.datetime64(end, 'ns') if end is not None else None
+        parts = []
+
+        for block in self.blocks.get(machine, []):
+            if (start is not None and block.end < start) or (end is not None and block.start >= end):
+                continue
+            arrays = block.decode()
+            parts.append(pd.DataFrame({
+                'timestamp': arrays['timestamp'],
+                'status': pd.Categorical.from_codes(arrays['status'], STATUSES),
+                **{name: arrays[name] for name in (metrics or self.metrics)}
+            }))
+        for rows in self._open.get(machine, []):
+            parts.append(rows[['timestamp', 'status'] + list(metrics or self.metrics)])
+
+        if not parts:
+            return pd.DataFrame(columns=['timestamp', 'status'] + list(metrics or self.metrics))
+        frame = pd.concat(parts, ignore_index=True)
+        if start is not None:
+            frame = frame[frame['timestamp'] >= start]
+        if end is not None:
+            frame = frame[frame['timestamp'] < end]
+        return frame.reset_index(drop=True)
+
+    @property
+    def nbytes(self):
+        """Memory held by sealed blocks"""
+        return sum(block.nbytes for blocks in self.blocks.values() for block in blocks)
+
+    @property
+    def samples(self):
+        """Number of sealed readings"""
+        return sum(block.count for blocks in self.blocks.values() for block in blocks)
+
+
+def benchmark(days=7, interval_minutes=1, block_rows=1440, precision=0.01):
+    """Compare raw, XOR and quantized histories on generated telemetry
+
+    Returns one row per encoding with bytes per reading, compression ratio against
+    raw float64 and sequential decode throughput in metric samples per second.
+    """
+    from data_generator import ManufacturingDataGenerator
+
+    data_generator = ManufacturingDataGenerator()
+    end = datetime.combine(datetime.now().date(), datetime.min.time())
+    readings = pd.concat(list(data_generator.iter_telemetry(
+        end - timedelta(days=days), end, interval_minutes=interval_minutes, seed=0)), ignore_index=True)
+
+    results = []
+    raw_bytes = None
+    for encoding in ENCODINGS:
+        history = TelemetryHistory(block_rows=block_rows, encoding=encoding, precision=precision)
+        started = time.perf_counter()
+        history.append(readings)
+        history.flush()
+        encode_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for blocks in history.blocks.values():
+            for block in blocks:
+                for name in history.metrics:
+                    block.decode_metric(name)
+        decode_seconds = time.perf_counter() - started
+
+        raw_bytes = raw_bytes or history.nbytes
+        metric_samples = history.samples * len(history.metrics)
+        results.append({
+            'encoding': encoding or 'raw',
+            'readings': history.samples,
+            'bytes': history.nbytes,
+            'bytes_per_reading': history.nbytes / history.samples,
+            'compression_ratio': raw_bytes / history.nbytes,
+            'encode_samples_per_s': metric_samples / encode_seconds,
+            'decode_samples_per_s': metric_samples / decode_seconds
+        })
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compressed telemetry history blocks")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--interval", type=int, default=1, help="Telemetry interval in minutes")
+    parser.add_argument("--block-rows", type=int, default=1440)
+    parser.add_argument("--precision", type=float, default=0.01, help="Quantization step for the lossy encoding")
+    args = parser.parse_args()
+
+    results = benchmark(args.days, args.interval, args.block_rows, args.precision)
+    for row in results.itertuples():
+        print(f"{row.encoding:>9}: {row.bytes:>12,} bytes, {row.bytes_per_reading:6.1f} B/reading, "
+              f"ratio {row.compression_ratio:5.2f}x, decode {row.decode_samples_per_s / 1e6:7.1f}M samples/s")
+
+
+if __name__ == "__main__":
+    main()
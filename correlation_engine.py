@@ -0,0 +1,155 @@
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+METRICS = ['temperature', 'vibration', 'production_rate', 'efficiency']
+
+# Alert metric names mapped to the telemetry column they were raised on
+ALERT_METRICS = {
+    'Temperature': 'temperature',
+    'Vibration': 'vibration',
+    'Production Rate': 'production_rate',
+    'Efficiency': 'efficiency',
+    'Status': 'efficiency'
+}
+
+
+class CorrelationEngine:
+    """Rolling correlation and lag-correlation matrices across every machine and metric
+
+    Keeps exponentially weighted covariances between all (machine, metric) signals for
+    lags 0..max_lag, updated incrementally from each new batch of readings with one
+    matrix product per lag, so history is never recomputed. Lag k relates a signal now
+    to every other signal k steps earlier.
+    """
+
+    def __init__(self, machines, metrics=None, window=240, max_lag=5, interval_minutes=1):
+        self.machines = list(machines)
+        self.metrics = list(metrics or METRICS)
+        self.signals = [(machine, metric) for machine in self.machines for metric in self.metrics]
+        self.window = window
+        self.max_lag = max_lag
+        self.interval_minutes = interval_minutes
+        self.alpha = 2 / (window + 1)
+
+        n = len(self.signals)
+        self.mean = None
+        self.covariances = np.zeros((max_lag + 1, n, n))  # covariances[k][i, j] = cov(x_i(t), x_j(t - k))
+        self._recent = np.zeros((max_lag, n))  # Last max_lag centred observations, oldest first
+        self.steps = 0
+        self.watermark = None  # Time up to which readings have been ingested
+        self._lock = threading.Lock()
+        self._ingest_lock = threading.Lock()
+
+    def update(self, observations):
+        """Fold a (steps x signals) array of time-ordered observations into the matrices"""
+        observations = np.asarray(observations, dtype=float)
+        if observations.ndim == 1:
+            observations = observations[None, :]
+        steps = len(observations)
+        if steps == 0:
+            return
+
+        with self._lock:
+            if self.mean is None:
+                # Signals with no reading yet start from zero
+                seen = np.maximum((~np.isnan(observations)).sum(axis=0), 1)
+                self.mean = np.nansum(observations, axis=0) / seen
+
+            # Missing readings contribute nothing once centred
+            observations = np.where(np.isnan(observations), self.mean, observations)
+
+            decay = (1 - self.alpha) ** steps
+            weights = self.alpha * (1 - self.alpha) ** np.arange(steps - 1, -1, -1)
+            self.mean = decay * self.mean + weights @ observations
+
+            centred = observations - self.mean
+            extended = np.vstack([self._recent, centred])
+            weighted = (centred * weights[:, None]).T
+
+            for lag in range(self.max_lag + 1):
+                lagged = extended[self.max_lag - lag:self.max_lag - lag + steps]
+                self.covariances[lag] = decay * self.covariances[lag] + weighted @ lagged
+
+            self._recent = extended[-self.max_lag:] if self.max_lag else self._recent
+            self.steps += steps
+
+    def update_readings(self, readings):
+        """Fold a telemetry DataFrame (timestamp, machine and metric columns) into the matrices"""
+        if readings.empty:
+            return
+        wide = readings.pivot_table(index='timestamp', columns='machine', values=self.metrics)
+        wide = wide.swaplevel(axis=1).reindex(columns=pd.MultiIndex.from_tuples(self.signals)).sort_index()
+        self.update(wide.to_numpy())
+        self.watermark = wide.index[-1] + timedelta(minutes=self.interval_minutes)
+
+    def ingest_since(self, data_generator, until=None):
+        """Pull readings since the last ingest, warming up on a few windows of history on first use
+
+        Serialised, so concurrent callers never fold the same readings in twice.
+        """
+        with self._ingest_lock:
+            until = until or datetime.now()
+            warmup_start = until - timedelta(minutes=3 * self.window * self.interval_minutes)
+            # Readings older than a few windows have decayed away, so skip them after long gaps
+            since = warmup_start if self.watermark is None else max(self.watermark, warmup_start)
+            if since >= until:
+                return
+            for chunk in data_generator.iter_telemetry(since, until, machines=self.machines,
+                                                       interval_minutes=self.interval_minutes):
+                self.update_readings(chunk)
+
+    def correlation_matrix(self, lag=0):
+        """Correlation matrix between all signals at the given lag"""
+        with self._lock:
+            std = np.sqrt(np.clip(np.diag(self.covariances[0]), 1e-12, None))
+            return self.covariances[lag] / np.outer(std, std)
+
+    def top_correlated(self, machine, metric, top_n=3, min_abs=0.5, exclude_same_machine=True):
+        """Signals most correlated with a machine metric, at the lag where each is strongest
+
+        A positive lag means the other signal follows this one by that many minutes, a
+        negative lag means it leads.
+        """
+        if (machine, metric) not in self.signals or self.steps < 2:
+            return []
+        index = self.signals.index((machine, metric))
+
+        with self._lock:
+            std = np.sqrt(np.clip(np.diag(self.covariances[0]), 1e-12, None))
+            # Rows: other signal earlier (it leads), columns: this signal earlier (it follows)
+            candidates = [(0, self.covariances[0][index])]
+            for lag in range(1, self.max_lag + 1):
+                candidates.append((-lag, self.covariances[lag][index]))
+                candidates.append((lag, self.covariances[lag][:, index]))
+
+            lags = np.array([lag for lag, _ in candidates])
+            correlations = np.array([row for _, row in candidates]) / (std[index] * std)
+
+        best = np.nanargmax(np.abs(correlations), axis=0)
+        best_correlation = correlations[best, np.arange(len(self.signals))]
+
+        results = []
+        for j in np.argsort(-np.abs(best_correlation)):
+            other_machine, other_metric = self.signals[j]
+            if j == index or (exclude_same_machine and other_machine == machine):
+                continue
+            if abs(best_correlation[j]) < min_abs:
+                break
+            results.append({
+                'machine': other_machine,
+                'metric': other_metric,
+                'correlation': float(best_correlation[j]),
+                'lag_minutes': int(lags[best[j]]) * self.interval_minutes
+            })
+            if len(results) >= top_n:
+                break
+        return results
+
+    def explain_alert(self, alert, top_n=3):
+        """Top correlated signals for an alert's machine and metric"""
+        metric = ALERT_METRICS.get(alert['metric'])
+        if metric is None:
+            return []
+        return self.top_correlated(alert['machine'], metric, top_n=top_n)
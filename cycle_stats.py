@@ -0,0 +1,200 @@
+import math
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from utils import get_machine_line
+
+SCOPES = ['machine', 'line', 'shift']
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    """Mergeable log-bucketed quantile sketch with bounded relative error (DDSketch style)
+
+    Values are counted in fixed geometric buckets between min_value and max_value, so
+    memory is constant, merging two sketches is adding their bucket counts, and any
+    quantile is returned within relative_accuracy of the true value.
+    """
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-3, max_value=1e6):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._offset = math.floor(math.log(min_value) / self._log_gamma)
+        n_buckets = math.ceil(math.log(max_value) / self._log_gamma) - self._offset + 1
+
+        self.bucket_counts = np.zeros(n_buckets, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _bucket_index(self, values):
+        values = np.clip(values, self.min_value, self.max_value)
+        index = np.ceil(np.log(values) / self._log_gamma).astype(np.int64) - self._offset
+        return np.clip(index, 0, len(self.bucket_counts) - 1)
+
+    def update(self, values):
+        """Add an array of values to the sketch"""
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+        self.add_counts(np.bincount(self._bucket_index(values), minlength=len(self.bucket_counts)),
+                        values.size, float(values.sum()), float(values.min()), float(values.max()))
+
+    def add_counts(self, bucket_counts, count, total, minimum, maximum):
+        """Add pre-bucketed values, as produced by grouped bulk updates"""
+        self.bucket_counts += bucket_counts
+        self.count += count
+        self.total += total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    def merge(self, other):
+        """Fold another sketch with the same parameters into this one"""
+        if (other.relative_accuracy, other.min_value, other.max_value) != \
+                (self.relative_accuracy, self.min_value, self.max_value):
+            raise ValueError("Cannot merge sketches with different parameters")
+        self.bucket_counts += other.bucket_counts
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        """Estimate the q-th quantile, or NaN for an empty sketch"""
+        if self.count == 0:
+            return float('nan')
+        rank = q * (self.count - 1)
+        bucket = int(np.searchsorted(np.cumsum(self.bucket_counts), rank, side='right'))
+        value = 2 * self.gamma ** (bucket + self._offset) / (self.gamma + 1)
+        return min(max(value, self.min), self.max)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float('nan')
+
+
+def shift_names(times):
+    """Vectorized shift name for an array of datetimes, matching get_shift_info"""
+    hours = pd.DatetimeIndex(times).hour.to_numpy()
+    return np.where((hours >= 6) & (hours < 14), "Day Shift",
+                    np.where((hours >= 14) & (hours < 22), "Evening Shift", "Night Shift"))
+
+
+class CycleStatistics:
+    """Streaming cycle-time percentiles per machine, line and shift for the current day
+
+    Cycle events are folded into one QuantileSketch per group as they arrive, so
+    percentiles are available instantly without keeping the cycles themselves. The
+    sketches start afresh at midnight when fed through ingest_since.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.sketches = {scope: {} for scope in SCOPES}
+        self.watermark = None  # Time up to which cycles have been ingested
+        self._cycle_carry = {}  # Per-machine cycle in progress, carried across ingest windows
+        self._lock = threading.Lock()
+        self._ingest_lock = threading.Lock()
+
+    def _sketch(self, scope, key):
+        sketch = self.sketches[scope].get(key)
+        if sketch is None:
+            sketch = self.sketches[scope][key] = QuantileSketch(self.relative_accuracy)
+        return sketch
+
+    def add_cycles(self, cycles):
+        """Fold a DataFrame of cycle events (machine, start, end, duration, ...) into the sketches"""
+        if cycles.empty:
+            return
+
+        durations = cycles['duration'].to_numpy(dtype=float)
+        machine_codes, machines = pd.factorize(cycles['machine'])
+        line_codes, lines = pd.factorize(np.array([get_machine_line(machine) for machine in machines]))
+        shift_codes, shifts = pd.factorize(shift_names(cycles['start']))
+        groups = {
+            'machine': (machine_codes, machines),
+            'line': (line_codes[machine_codes], lines),
+            'shift': (shift_codes, shifts)
+        }
+
+        # Bucket every duration once, then count all groups of a scope in a single bincount
+        template = QuantileSketch(self.relative_accuracy)
+        n_buckets = len(template.bucket_counts)
+        buckets = template._bucket_index(durations)
+
+        with self._lock:
+            for scope, (codes, keys) in groups.items():
+                counts = np.bincount(codes * n_buckets + buckets, minlength=len(keys) * n_buckets)
+                stats = pd.Series(durations).groupby(codes).agg(['count', 'sum', 'min', 'max'])
+                for code, key in enumerate(keys):
+                    self._sketch(scope, key).add_counts(
+                        counts[code * n_buckets:(code + 1) * n_buckets], int(stats.at[code, 'count']),
+                        float(stats.at[code, 'sum']), float(stats.at[code, 'min']), float(stats.at[code, 'max'])
+                    )
+
+            latest = cycles['end'].max()
+            if self.watermark is None or latest > self.watermark:
+                self.watermark = latest
+
+    def reset(self):
+        """Drop all sketches, e.g. at the start of a new day"""
+        with self._lock:
+            self.sketches = {scope: {} for scope in SCOPES}
+
+    def ingest_since(self, data_generator, until=None):
+        """Pull and fold in cycles completed since the last ingest, starting from today on first use
+
+        Serialised, so concurrent callers never fold the same window twice. When the
+        window crosses midnight, the previous day's cycles are dropped with its sketches.
+        """
+        with self._ingest_lock:
+            until = until or datetime.now()
+            midnight = datetime.combine(until.date(), datetime.min.time())
+            since = midnight if self.watermark is None else self.watermark
+            if since >= until:
+                return 0
+            if since < midnight:
+                # Run the cycle sequences up to midnight so cycles spanning it still finish once
+                data_generator.generate_cycle_events(since, midnight, carry=self._cycle_carry)
+                self.reset()
+                since = midnight
+            cycles = data_generator.generate_cycle_events(since, until, carry=self._cycle_carry)
+            self.add_cycles(cycles)
+            # Advance even when no cycle finished so the same window is not generated again
+            self.watermark = pd.Timestamp(until)
+            return len(cycles)
+
+    def merge(self, other):
+        """Merge another CycleStatistics, e.g. from a parallel worker"""
+        with self._lock:
+            for scope in SCOPES:
+                for key, sketch in other.sketches[scope].items():
+                    self._sketch(scope, key).merge(sketch)
+            if other.watermark is not None and (self.watermark is None or other.watermark > self.watermark):
+                self.watermark = other.watermark
+
+    def get_percentiles(self, scope, key, quantiles=QUANTILES):
+        """Get cycle-time quantiles for one machine, line or shift"""
+        sketch = self.sketches[scope].get(key)
+        if sketch is None:
+            return {q: float('nan') for q in quantiles}
+        return {q: sketch.quantile(q) for q in quantiles}
+
+    def get_count(self, scope, key):
+        sketch = self.sketches[scope].get(key)
+        return sketch.count if sketch is not None else 0
+
+    def summary(self, scope, quantiles=QUANTILES):
+        """Summarise every group of a scope as a DataFrame"""
+        rows = []
+        for key, sketch in sorted(self.sketches[scope].items()):
+            row = {scope.title(): key, 'Cycles': sketch.count}
+            row.update({f"p{q * 100:g}": sketch.quantile(q) for q in quantiles})
+            rows.append(row)
+        return pd.DataFrame(rows)
@@ -4,6 +4,8 @@ from datetime import datetime, timedelta
 import random
 import math
 
+CYCLE_VERDICTS = ["Pass", "Inspect", "Fail"]
+
 class ManufacturingDataGenerator:
     def __init__(self):
         self.machines = [
@@ -89,9 +91,7 @@ class ManufacturingDataGenerator:
         return {
             **status_data,
             'uptime_hours': random.uniform(120, 168),  # Hours in last week
-            'total_production_today': int(config["base_production"] * 8 * random.uniform(0.7, 1.1)),
-            'defect_rate': random.uniform(0.1, 3.0),
-            'maintenance_due': random.randint(5, 45)  # Days
+            'total_production_today': int(config["base_production"] * 8 * random.uniform(0.7, 1.1))
         }
 
     def generate_time_series_data(self, metric_type, hours=8, machine=None):
@@ -136,37 +136,20 @@ class ManufacturingDataGenerator:
         })
 
     def generate_production_cycles(self, machine, count=10):
-        """Generate recent production cycles for a machine"""
-        cycles = []
-        base_time = datetime.now()
-        
-        config = self.machine_configs[machine]
-        
-        for i in range(count):
-            start_time = base_time - timedelta(minutes=i*15 + random.randint(0, 10))
-            cycle_time = 45 + random.gauss(0, 8)  # seconds
-            end_time = start_time + timedelta(seconds=cycle_time)
-            
-            quality_score = random.uniform(85, 100)
-            status = "Pass" if quality_score > 90 else "Inspect" if quality_score > 80 else "Fail"
-            
-            cycles.append({
-                'Cycle': f"C{1000 + i}",
-                'Start Time': start_time.strftime("%H:%M:%S"),
-                'End Time': end_time.strftime("%H:%M:%S"),
-                'Cycle Time (s)': f"{cycle_time:.1f}",
-                'Quality Score': f"{quality_score:.1f}",
-                'Status': status
-            })
+        """Generate the most recent production cycles for a machine as numeric events, newest first"""
+        end_time = datetime.now()
+        start_time = end_time - timedelta(minutes=15 * count + 60)
+        cycles = self.generate_cycle_events(start_time, end_time, machines=[machine])
         
-        return cycles
+        return cycles.tail(count).iloc[::-1].reset_index(drop=True)
 
-    def generate_historical_data(self, metric_type, days=7, machine=None):
-        """Generate historical data for analysis"""
+    def generate_historical_data(self, metric_type, days=7, machine=None, start_date=None):
+        """Generate historical data for analysis, ending yesterday unless start_date is given"""
         dates = []
         values = []
         
-        start_date = datetime.now().date() - timedelta(days=days)
+        if start_date is None:
+            start_date = datetime.now().date() - timedelta(days=days)
         
         for i in range(days):
             date = start_date + timedelta(days=i)
@@ -196,31 +179,127 @@ class ManufacturingDataGenerator:
             'value': values
         })
 
-    def generate_downtime_events(self, days=7):
-        """Generate downtime events for analysis"""
-        events = []
-        
-        # Generate 2-5 events per day
-        for day in range(days):
-            event_count = random.randint(1, 4)
-            event_date = datetime.now().date() - timedelta(days=days-day)
-            
-            for _ in range(event_count):
-                machine = random.choice(self.machines)
-                reason = random.choice(self.downtime_reasons)
+    def iter_telemetry(self, start, end, machines=None, interval_minutes=1, chunk_rows=50000, seed=None):
+        """Yield per-machine telemetry readings between start and end as bounded DataFrame chunks"""
+        machines = list(self.machines if machines is None else machines)
+        if not machines:
+            return
+        rng = np.random.default_rng(seed)
+        step = np.timedelta64(interval_minutes, 'm')
+        steps_per_chunk = max(1, chunk_rows // max(1, len(machines)))
+
+        base_temp = np.array([self.machine_configs[m]["base_temp"] for m in machines], dtype=float)
+        base_production = np.array([self.machine_configs[m]["base_production"] for m in machines], dtype=float)
+        base_efficiency = np.array([self.machine_configs[m]["base_efficiency"] for m in machines], dtype=float)
+        machine_labels = np.array(machines, dtype=object)
+
+        chunk_start = np.datetime64(start, 'm')
+        stop = np.datetime64(end, 'm')
+        while chunk_start < stop:
+            times = np.arange(chunk_start, min(chunk_start + steps_per_chunk * step, stop), step)
+            n_times, n_machines = len(times), len(machines)
+            shape = (n_times, n_machines)
+
+            # Daily temperature cycle
+            minute_of_day = (times - times.astype('datetime64[D]')).astype(int)
+            daily_cycle = np.sin(2 * np.pi * minute_of_day / 1440)[:, None]
+
+            # Machine status determination, matching generate_machine_status
+            status_rand = rng.random(shape)
+            status = np.where(status_rand < 0.15, "Error", np.where(status_rand < 0.25, "Idle", "Running")).astype(object)
+            efficiency = np.where(
+                status_rand < 0.15, rng.uniform(0, 30, shape),
+                np.where(status_rand < 0.25, rng.uniform(0, 10, shape),
+                         base_efficiency + rng.normal(0, 8, shape))
+            )
+
+            yield pd.DataFrame({
+                'timestamp': np.repeat(times, n_machines).astype('datetime64[ns]'),
+                'machine': np.tile(machine_labels, n_times),
+                'status': status.ravel(),
+                'temperature': (base_temp + 5 * daily_cycle + rng.normal(0, 3, shape)).ravel(),
+                'vibration': np.abs(rng.normal(2.5, 1.0, shape)).ravel(),
+                'production_rate': np.maximum(0, base_production + rng.normal(0, 15, shape)).ravel(),
+                'efficiency': np.clip(efficiency, 0, 100).ravel()
+            })
+
+            chunk_start = times[-1] + step
+
+    def iter_downtime_events(self, start_date, end_date, machines=None):
+        """Yield downtime events day by day between start_date and end_date, oldest first"""
+        machines = list(self.machines if machines is None else machines)
+        if not machines:
+            return
+        day = start_date
+
+        while day <= end_date:
+            day_events = []
+            for _ in range(random.randint(1, 4)):
                 duration = random.randint(5, 180)  # 5 minutes to 3 hours
-                
-                start_time = datetime.combine(event_date, datetime.min.time()) + timedelta(
-                    hours=random.randint(6, 22),
-                    minutes=random.randint(0, 59)
-                )
-                
-                events.append({
-                    'machine': machine,
-                    'reason': reason,
-                    'start_time': start_time.strftime("%Y-%m-%d %H:%M"),
+                day_events.append({
+                    'machine': random.choice(machines),
+                    'reason': random.choice(self.downtime_reasons),
+                    'start_time': datetime.combine(day, datetime.min.time()) + timedelta(
+                        hours=random.randint(6, 22),
+                        minutes=random.randint(0, 59)
+                    ),
                     'duration_minutes': duration,
                     'severity': 'Critical' if duration > 120 else 'Major' if duration > 60 else 'Minor'
                 })
-        
-        return sorted(events, key=lambda x: x['start_time'], reverse=True)
+
+            yield from sorted(day_events, key=lambda x: x['start_time'])
+            day += timedelta(days=1)
+
+    def generate_cycle_events(self, start, end, machines=None, cycles_per_hour=4, seed=None, carry=None):
+        """Generate numeric production cycle events completed between start and end for each machine
+
+        Pass the same `carry` dict to consecutive calls to continue each machine's cycle
+        sequence across windows: the cycle still running at `end` is kept there as
+        machine -> (start, duration) and returned once, by the call whose window it finishes in.
+        """
+        machines = list(self.machines if machines is None else machines)
+        rng = np.random.default_rng(seed)
+        end = np.datetime64(end, 'ms')
+        mean_gap = max(0.0, 3600 / cycles_per_hour - 45)
+        frames = []
+
+        for machine in machines:
+            carried = carry is not None and machine in carry
+            origin = np.datetime64(carry[machine][0], 'ms') if carried else np.datetime64(start, 'ms')
+            span = max(0.0, (end - origin).astype(float) / 1000)
+            n = int(span / (45 + mean_gap) * 1.2) + 10
+            durations = np.maximum(5, rng.normal(45, 8, n))  # seconds
+            gaps = rng.exponential(mean_gap, n)
+            if carried:
+                gaps[0], durations[0] = 0.0, carry[machine][1]  # Resume the cycle in progress
+            offsets = np.cumsum(gaps + durations) - durations
+            keep = offsets + durations < span
+            if carry is not None:
+                unfinished = np.flatnonzero(~keep)
+                if len(unfinished):
+                    i = unfinished[0]
+                    carry[machine] = (origin + np.timedelta64(int(offsets[i] * 1000), 'ms'), durations[i])
+                else:
+                    next_offset = offsets[-1] + durations[-1] + rng.exponential(mean_gap)
+                    carry[machine] = (origin + np.timedelta64(int(next_offset * 1000), 'ms'),
+                                      max(5.0, rng.normal(45, 8)))
+            durations, offsets = durations[keep], offsets[keep]
+
+            # About 1.5% of cycles are scrapped outright, the rest spread over pass and inspect
+            failed = rng.random(len(durations)) < 0.015
+            quality = np.where(failed, rng.uniform(60, 80, len(durations)), rng.uniform(85, 100, len(durations)))
+            starts = origin + (offsets * 1000).astype('timedelta64[ms]')
+            frames.append(pd.DataFrame({
+                'machine': machine,
+                'start': starts,
+                'end': starts + (durations * 1000).astype('timedelta64[ms]'),
+                'duration': durations,
+                'quality': quality,
+                'verdict': np.where(quality > 90, 0, np.where(quality > 80, 1, 2)).astype(np.int8)
+            }))
+
+        if not frames:
+            return pd.DataFrame({'machine': pd.Series(dtype=object), 'start': pd.Series(dtype='datetime64[ms]'),
+                                 'end': pd.Series(dtype='datetime64[ms]'), 'duration': pd.Series(dtype=float),
+                                 'quality': pd.Series(dtype=float), 'verdict': pd.Series(dtype=np.int8)})
+        return pd.concat(frames, ignore_index=True)
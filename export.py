@@ -0,0 +1,216 @@
+import os
+import argparse
+import threading
+from datetime import datetime, timedelta
+import pandas as pd
+from utils import get_shift_window
+
+EXPORT_FORMATS = ['csv', 'parquet']
+DEFAULT_CHUNK_ROWS = 50000
+
+
+def iter_record_chunks(records, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Group an iterable of dict records into DataFrame chunks of at most chunk_rows rows"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= chunk_rows:
+            yield pd.DataFrame(batch)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch)
+
+
+def write_csv(chunks, path):
+    """Write DataFrame chunks to a CSV file one chunk at a time, returning the row count"""
+    rows = 0
+    with open(path, 'w', newline='') as f:
+        for chunk in chunks:
+            chunk.to_csv(f, header=rows == 0, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def write_parquet(chunks, path):
+    """Write DataFrame chunks to a Parquet file as one row group per chunk, returning the row count"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def write_chunks(chunks, path, fmt='csv'):
+    """Stream DataFrame chunks to path in the given export format"""
+    if fmt == 'csv':
+        return write_csv(chunks, path)
+    elif fmt == 'parquet':
+        return write_parquet(chunks, path)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+
+def iter_telemetry_chunks(data_generator, start, end, machines=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Telemetry readings for the range as DataFrame chunks"""
+    return data_generator.iter_telemetry(start, end, machines=machines, chunk_rows=chunk_rows)
+
+
+def iter_alert_chunks(alert_system, start, end, machines=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Alert history entries created in the range as DataFrame chunks"""
+    start_epoch, end_epoch = start.timestamp(), end.timestamp()
+
+    def records():
+        # Snapshot, the alert scheduler may be appending or trimming expired entries
+        for alert in list(alert_system.alert_history):
+            if not start_epoch <= alert.created_at < end_epoch:
+                continue
+            if machines is not None and alert.machine not in machines:
+                continue
+            # Values mix numbers and labels such as 'Low', so keep one column type across chunks
+            yield {**alert.to_dict(), 'value': str(alert['value'])}
+
+    return iter_record_chunks(records(), chunk_rows)
+
+
+def iter_downtime_chunks(data_generator, start, end, machines=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Downtime events starting in the range as DataFrame chunks"""
+    def records():
+        for event in data_generator.iter_downtime_events(start.date(), end.date(), machines=machines):
+            if start <= event['start_time'] < end:
+                yield event
+
+    return iter_record_chunks(records(), chunk_rows)
+
+
+def export_dataset(dataset, path, start, end, data_generator, alert_system=None, machines=None,
+                   fmt='csv', chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Export one dataset ('telemetry', 'alerts' or 'downtime') for a date range to path"""
+    if dataset == 'telemetry':
+        chunks = iter_telemetry_chunks(data_generator, start, end, machines, chunk_rows)
+    elif dataset == 'alerts':
+        chunks = iter_alert_chunks(alert_system, start, end, machines, chunk_rows)
+    elif dataset == 'downtime':
+        chunks = iter_downtime_chunks(data_generator, start, end, machines, chunk_rows)
+    else:
+        raise ValueError(f"Unknown dataset: {dataset}")
+
+    return write_chunks(chunks, path, fmt)
+
+
+def export_all(output_dir, start, end, data_generator, alert_system=None, machines=None,
+               fmt='csv', chunk_rows=DEFAULT_CHUNK_ROWS, prefix=''):
+    """Export telemetry, alerts and downtime for a date range into output_dir"""
+    os.makedirs(output_dir, exist_ok=True)
+    datasets = ['telemetry', 'downtime'] + (['alerts'] if alert_system is not None else [])
+
+    written = {}
+    for dataset in datasets:
+        path = os.path.join(output_dir, f"{prefix}{dataset}.{fmt}")
+        rows = export_dataset(dataset, path, start, end, data_generator, alert_system,
+                              machines, fmt, chunk_rows)
+        written[path] = rows
+    return written
+
+
+class ShiftReportScheduler:
+    """Background job writing an export of each finished shift to a local directory"""
+
+    def __init__(self, output_dir, data_generator, alert_system=None, machines=None, fmt='csv'):
+        self.output_dir = output_dir
+        self.data_generator = data_generator
+        self.alert_system = alert_system
+        self.machines = machines
+        self.fmt = fmt
+        self.last_report = None
+        self.failed_reports = 0
+        self.report_error = None
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the scheduler thread if it is not already running"""
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="shift-report-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def write_report(self, shift_name, shift_start, shift_end):
+        """Export a single shift window and return the written files"""
+        prefix = f"{shift_start:%Y%m%d_%H%M}_{shift_name.lower().replace(' ', '_')}_"
+        written = export_all(self.output_dir, shift_start, shift_end, self.data_generator,
+                             self.alert_system, self.machines, self.fmt, prefix=prefix)
+        self.last_report = {'shift': shift_name, 'start': shift_start, 'end': shift_end, 'files': written}
+        return written
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            shift_name, shift_start, shift_end = get_shift_window(datetime.now())
+            wait_seconds = (shift_end - datetime.now()).total_seconds()
+            if self._stop_event.wait(max(0, wait_seconds)):
+                break
+            try:
+                self.write_report(shift_name, shift_start, shift_end)
+            except Exception as error:  # Keep writing later shifts even if one export fails
+                self.failed_reports += 1
+                self.report_error = f"{datetime.now():%H:%M:%S} {type(error).__name__}: {error}"
+
+
+def main():
+    from data_generator import ManufacturingDataGenerator
+
+    parser = argparse.ArgumentParser(description="Export manufacturing data to CSV or Parquet")
+    parser.add_argument("output_dir", help="Directory to write exports into")
+    parser.add_argument("--start", help="Start date (YYYY-MM-DD), defaults to 7 days ago")
+    parser.add_argument("--end", help="End date (YYYY-MM-DD, exclusive), defaults to now")
+    parser.add_argument("--machines", nargs="*", help="Machines to include, defaults to all")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default='csv')
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--shift-reports", action="store_true",
+                        help="Run in the background job mode, writing a report at the end of every shift")
+    args = parser.parse_args()
+
+    data_generator = ManufacturingDataGenerator()
+
+    if args.shift_reports:
+        scheduler = ShiftReportScheduler(args.output_dir, data_generator, machines=args.machines, fmt=args.format)
+        scheduler.start()
+        try:
+            while scheduler.is_running():
+                scheduler._thread.join(1)
+        except KeyboardInterrupt:
+            scheduler.stop()
+        return
+
+    end = datetime.fromisoformat(args.end) if args.end else datetime.now()
+    start = datetime.fromisoformat(args.start) if args.start else end - timedelta(days=7)
+    written = export_all(args.output_dir, start, end, data_generator, machines=args.machines,
+                         fmt=args.format, chunk_rows=args.chunk_rows)
+    for path, rows in written.items():
+        print(f"{path}: {rows:,} rows")
+
+
+if __name__ == "__main__":
+    main()
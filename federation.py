@@ -0,0 +1,292 @@
+import os
+import sys
+import glob
+import json
+import argparse
+import threading
+import subprocess
+from datetime import datetime, timedelta
+import numpy as np
+from alert_system import SEVERITIES
+
+ROLLUP_VERSION = 1
+ROLLUP_SUFFIX = ".rollup.json"
+
+# Additive counters behind the OEE components
+COUNTERS = ['readings', 'planned_minutes', 'run_minutes', 'ideal_units', 'actual_units', 'total_cycles', 'good_cycles']
+
+
+class PlantRollup:
+    """Mergeable partial aggregates for one plant, or for several once combined
+
+    Only additive counts and sums are kept, so rollups from any number of instances merge
+    exactly by adding them up. Ratios such as OEE are derived from the merged counters:
+    availability = run / planned minutes, performance = actual / ideal units at the
+    running rate, quality = good / total cycles.
+    """
+
+    def __init__(self, plants, start, end, counters=None, downtime_minutes=None, downtime_events=None,
+                 alerts=None, generated_at=None):
+        self.plants = list(plants)
+        self.start = start
+        self.end = end
+        self.counters = {name: 0.0 for name in COUNTERS}
+        self.counters.update(counters or {})
+        self.downtime_minutes = dict(downtime_minutes or {})  # reason -> minutes
+        self.downtime_events = dict(downtime_events or {})    # reason -> event count
+        self.alerts = {severity: 0 for severity in SEVERITIES}
+        self.alerts.update(alerts or {})
+        self.generated_at = generated_at or datetime.now()
+
+    @classmethod
+    def combine(cls, rollups):
+        """Merge rollups by summing their counters, in time proportional to the number of rollups"""
+        rollups = list(rollups)
+        if not rollups:
+            raise ValueError("No rollups to combine")
+        merged = cls([], min(r.start for r in rollups), max(r.end for r in rollups),
+                     generated_at=min(r.generated_at for r in rollups))
+        for rollup in rollups:
+            merged.plants.extend(rollup.plants)
+            for name, value in rollup.counters.items():
+                merged.counters[name] = merged.counters.get(name, 0.0) + value
+            for reason, minutes in rollup.downtime_minutes.items():
+                merged.downtime_minutes[reason] = merged.downtime_minutes.get(reason, 0) + minutes
+            for reason, count in rollup.downtime_events.items():
+                merged.downtime_events[reason] = merged.downtime_events.get(reason, 0) + count
+            for severity, count in rollup.alerts.items():
+                merged.alerts[severity] = merged.alerts.get(severity, 0) + count
+        return merged
+
+    @staticmethod
+    def _ratio(numerator, denominator):
+        return 100 * numerator / denominator if denominator else float('nan')
+
+    @property
+    def availability(self):
+        return self._ratio(self.counters['run_minutes'], self.counters['planned_minutes'])
+
+    @property
+    def performance(self):
+        return self._ratio(self.counters['actual_units'], self.counters['ideal_units'])
+
+    @property
+    def quality(self):
+        return self._ratio(self.counters['good_cycles'], self.counters['total_cycles'])
+
+    @property
+    def oee(self):
+        return self.availability * self.performance * self.quality / 10000
+
+    def to_dict(self):
+        return {
+            'version': ROLLUP_VERSION,
+            'plants': self.plants,
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'generated_at': self.generated_at.isoformat(),
+            'counters': self.counters,
+            'downtime_minutes': self.downtime_minutes,
+            'downtime_events': self.downtime_events,
+            'alerts': self.alerts
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != ROLLUP_VERSION:
+            raise ValueError(f"Unsupported rollup version: {data.get('version')}")
+        return cls(data['plants'], datetime.fromisoformat(data['start']), datetime.fromisoformat(data['end']),
+                   data['counters'], data['downtime_minutes'], data['downtime_events'], data['alerts'],
+                   datetime.fromisoformat(data['generated_at']))
+
+
+def build_rollup(plant, data_generator, alert_system=None, end=None, window_hours=24, interval_minutes=1):
+    """Aggregate one instance's readings, cycles, downtime and alerts over the trailing window"""
+    end = end or datetime.now()
+    start = end - timedelta(hours=window_hours)
+    counters = {name: 0.0 for name in COUNTERS}
+    ideal_rates = {machine: config['base_production'] for machine, config in data_generator.machine_configs.items()}
+
+    for chunk in data_generator.iter_telemetry(start, end, interval_minutes=interval_minutes):
+        running = chunk['status'].to_numpy() == 'Running'
+        hours = interval_minutes / 60
+        counters['readings'] += len(chunk)
+        counters['planned_minutes'] += len(chunk) * interval_minutes
+        counters['run_minutes'] += float(running.sum() * interval_minutes)
+        counters['actual_units'] += float(chunk['production_rate'].to_numpy()[running].sum() * hours)
+        counters['ideal_units'] += float(chunk['machine'].map(ideal_rates).to_numpy(dtype=float)[running].sum() * hours)
+
+    cycles = data_generator.generate_cycle_events(start, end)
+    counters['total_cycles'] = float(len(cycles))
+    counters['good_cycles'] = float((cycles['verdict'] == 0).sum())
+
+    downtime_minutes, downtime_events = {}, {}
+    for event in data_generator.iter_downtime_events(start.date(), end.date()):
+        if start <= event['start_time'] < end:
+            reason = event['reason']
+            downtime_minutes[reason] = downtime_minutes.get(reason, 0) + event['duration_minutes']
+            downtime_events[reason] = downtime_events.get(reason, 0) + 1
+
+    alerts = {severity: 0 for severity in SEVERITIES}
+    if alert_system is not None:
+        history = list(alert_system.alert_history)  # Snapshot, the alert scheduler may be appending
+        created = np.array([alert.created_at for alert in history], dtype=float)
+        severities = np.array([alert.severity for alert in history], dtype=str)
+        in_window = (created >= start.timestamp()) & (created < end.timestamp())
+        for severity, count in zip(*np.unique(severities[in_window], return_counts=True)):
+            alerts[severity] = int(count)
+
+    return PlantRollup([plant], start, end, counters, downtime_minutes, downtime_events, alerts)
+
+
+def rollup_path(directory, plant):
+    return os.path.join(directory, plant.lower().replace(' ', '_') + ROLLUP_SUFFIX)
+
+
+def publish_rollup(rollup, directory):
+    """Write a single-plant rollup into a directory, replacing the previous one atomically"""
+    os.makedirs(directory, exist_ok=True)
+    path = rollup_path(directory, rollup.plants[0])
+    with open(path + ".tmp", 'w') as f:
+        json.dump(rollup.to_dict(), f)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def load_rollups(sources):
+    """Read rollups from rollup files or directories of them
+
+    Returns (rollups, errors); an unreadable file is reported rather than failing the
+    whole federation. A plant found in several sources is counted once, from its newest rollup.
+    """
+    latest, errors = {}, []
+    for source in sources:
+        paths = sorted(glob.glob(os.path.join(source, "*" + ROLLUP_SUFFIX))) if os.path.isdir(source) else [source]
+        for path in paths:
+            try:
+                with open(path) as f:
+                    rollup = PlantRollup.from_dict(json.load(f))
+            except (OSError, ValueError, KeyError) as error:
+                errors.append(f"{path}: {error}")
+                continue
+            key = tuple(rollup.plants)
+            if key not in latest or rollup.generated_at > latest[key].generated_at:
+                latest[key] = rollup
+    return list(latest.values()), errors
+
+
+class RollupPublisher:
+    """Background job publishing this instance's rollup to a directory on a fixed cadence"""
+
+    def __init__(self, directory, plant, data_generator, alert_system=None, interval_seconds=60, window_hours=24):
+        self.directory = directory
+        self.plant = plant
+        self.data_generator = data_generator
+        self.alert_system = alert_system
+        self.interval_seconds = interval_seconds
+        self.window_hours = window_hours
+        self.last_published = None
+        self.failed_publishes = 0
+        self.publish_error = None
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the publisher thread if it is not already running"""
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="rollup-publisher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the publisher thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def publish(self):
+        """Build and publish the current rollup, returning the written path"""
+        rollup = build_rollup(self.plant, self.data_generator, self.alert_system, window_hours=self.window_hours)
+        path = publish_rollup(rollup, self.directory)
+        self.last_published = rollup.generated_at
+        return path
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.publish()
+            except Exception as error:  # Retry on the next interval rather than stop publishing for good
+                self.failed_publishes += 1
+                self.publish_error = f"{datetime.now():%H:%M:%S} {type(error).__name__}: {error}"
+            if self._stop_event.wait(self.interval_seconds):
+                break
+
+
+def print_federation(rollups):
+    for rollup in rollups + [PlantRollup.combine(rollups)]:
+        name = ", ".join(rollup.plants) if len(rollup.plants) == 1 else f"Federated ({len(rollup.plants)} plants)"
+        alerts = sum(rollup.alerts.values())
+        print(f"{name:>28}: OEE {rollup.oee:5.1f}% (A {rollup.availability:5.1f}% P {rollup.performance:5.1f}% "
+              f"Q {rollup.quality:5.1f}%), downtime {sum(rollup.downtime_minutes.values()):,} min, {alerts} alerts")
+
+
+def main():
+    from data_generator import ManufacturingDataGenerator
+
+    parser = argparse.ArgumentParser(description="Publish and combine plant rollups for federated dashboards")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    publish = commands.add_parser("publish", help="Publish this instance's rollup to a directory")
+    publish.add_argument("directory")
+    publish.add_argument("--plant", required=True, help="Plant name for this instance")
+    publish.add_argument("--window-hours", type=int, default=24)
+    publish.add_argument("--interval", type=int, default=60, help="Seconds between publishes")
+    publish.add_argument("--once", action="store_true", help="Publish a single rollup and exit")
+
+    aggregate = commands.add_parser("aggregate", help="Combine rollups from directories or files")
+    aggregate.add_argument("sources", nargs="+")
+
+    simulate = commands.add_parser("simulate", help="Publish from several local instances, one process per plant")
+    simulate.add_argument("directory")
+    simulate.add_argument("--plants", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "publish":
+        publisher = RollupPublisher(args.directory, args.plant, ManufacturingDataGenerator(),
+                                    interval_seconds=args.interval, window_hours=args.window_hours)
+        if args.once:
+            print(publisher.publish())
+            return
+        publisher.start()
+        try:
+            while publisher.is_running():
+                publisher._thread.join(1)
+        except KeyboardInterrupt:
+            publisher.stop()
+
+    elif args.command == "aggregate":
+        rollups, errors = load_rollups(args.sources)
+        for error in errors:
+            print(f"skipped {error}", file=sys.stderr)
+        if rollups:
+            print_federation(rollups)
+
+    elif args.command == "simulate":
+        processes = [
+            subprocess.Popen([sys.executable, os.path.abspath(__file__), "publish", args.directory,
+                              "--plant", f"Plant-{i + 1}", "--once"], stdout=subprocess.DEVNULL)
+            for i in range(args.plants)
+        ]
+        for process in processes:
+            process.wait()
+        print_federation(load_rollups([args.directory])[0])
+
+
+if __name__ == "__main__":
+    main()
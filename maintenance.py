@@ -0,0 +1,170 @@
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from data_generator import CYCLE_VERDICTS
+
+FEATURES = [
+    'vibration_rms', 'vibration_trend', 'temperature_drift',
+    'error_frequency', 'cycle_time_creep', 'defect_rate'
+]
+
+
+def _ew_block(mean, values, alpha):
+    """Fold a (steps x machines) block into exponentially weighted means, skipping NaNs per machine"""
+    present = ~np.isnan(values)
+    steps = present.sum(axis=0)
+    # Position of each reading counted from the newest one of its machine
+    age = np.cumsum(present[::-1], axis=0)[::-1] - 1
+    weights = np.where(present, alpha * (1 - alpha) ** age, 0.0)
+    block = np.nansum(np.where(present, values, 0.0) * weights, axis=0)
+
+    updated = (1 - alpha) ** steps * mean + block
+    # Machines seen for the first time start from their block average
+    fresh = np.isnan(mean) & (steps > 0)
+    updated[fresh] = np.nansum(np.where(present, values, 0.0), axis=0)[fresh] / steps[fresh]
+    return np.where(steps > 0, updated, mean)
+
+
+class FeaturePipeline:
+    """Per-machine rolling maintenance features, updated incrementally as readings arrive
+
+    Every feature is an exponentially weighted statistic held in one array per machine,
+    so each batch of readings or cycles is folded in once and history is never reread.
+    Fast averages follow the last `fast_window` readings, slow ones form the baseline.
+    """
+
+    def __init__(self, machines, fast_window=30, slow_window=720):
+        self.machines = list(machines)
+        self.fast_alpha = 2 / (fast_window + 1)
+        self.slow_alpha = 2 / (slow_window + 1)
+
+        n = len(self.machines)
+        self.state = {name: np.full(n, np.nan) for name in [
+            'vibration_sq', 'vibration_fast', 'vibration_slow', 'temperature_fast', 'temperature_slow',
+            'error', 'cycle_fast', 'cycle_slow', 'defect'
+        ]}
+        self.watermark = None  # Time up to which readings have been ingested
+        self._cycle_carry = {}  # Per-machine cycle in progress, carried across ingest windows
+        self._lock = threading.Lock()
+        self._ingest_lock = threading.Lock()
+
+    def update_readings(self, readings):
+        """Fold a telemetry DataFrame (timestamp, machine, status and metric columns) into the features"""
+        if readings.empty:
+            return
+        frame = readings.assign(error=(readings['status'] == 'Error').astype(float),
+                                vibration_sq=readings['vibration'] ** 2)
+        wide = frame.pivot_table(index='timestamp', columns='machine',
+                                 values=['vibration', 'vibration_sq', 'temperature', 'error'])
+
+        def block(column):
+            return wide[column].reindex(columns=self.machines).to_numpy(dtype=float)
+
+        vibration, temperature = block('vibration'), block('temperature')
+        with self._lock:
+            self.state['vibration_sq'] = _ew_block(self.state['vibration_sq'], block('vibration_sq'), self.fast_alpha)
+            self.state['vibration_fast'] = _ew_block(self.state['vibration_fast'], vibration, self.fast_alpha)
+            self.state['vibration_slow'] = _ew_block(self.state['vibration_slow'], vibration, self.slow_alpha)
+            self.state['temperature_fast'] = _ew_block(self.state['temperature_fast'], temperature, self.fast_alpha)
+            self.state['temperature_slow'] = _ew_block(self.state['temperature_slow'], temperature, self.slow_alpha)
+            self.state['error'] = _ew_block(self.state['error'], block('error'), self.slow_alpha)
+            self.watermark = wide.index[-1] + timedelta(minutes=1)
+
+    def update_cycles(self, cycles):
+        """Fold a DataFrame of production cycle events into the cycle-time and defect features"""
+        if cycles.empty:
+            return
+        failed = cycles['verdict'] == CYCLE_VERDICTS.index("Fail")
+        grouped = cycles.assign(defect=failed.astype(float)).groupby('machine')
+        stats = grouped.agg(count=('duration', 'size'), duration=('duration', 'mean'), defect=('defect', 'mean'))
+        stats = stats.reindex(self.machines)
+        count = stats['count'].fillna(0).to_numpy()
+
+        def fold(name, values, alpha):
+            # A batch of n cycles moves the average as n sequential updates would on average
+            weight = 1 - (1 - alpha) ** count
+            current = self.state[name]
+            updated = np.where(np.isnan(current), values, current + weight * (values - current))
+            self.state[name] = np.where(count > 0, updated, current)
+
+        with self._lock:
+            fold('cycle_fast', stats['duration'].to_numpy(), self.fast_alpha)
+            fold('cycle_slow', stats['duration'].to_numpy(), self.slow_alpha)
+            fold('defect', stats['defect'].to_numpy(), self.slow_alpha)
+
+    def ingest_since(self, data_generator, until=None, warmup_hours=12):
+        """Pull readings and cycles since the last ingest, warming up on recent history on first use
+
+        Serialised, so the alert scheduler and page views never fold the same window twice.
+        """
+        with self._ingest_lock:
+            until = until or datetime.now()
+            warmup_start = until - timedelta(hours=warmup_hours)
+            # Older readings have decayed out of the slow averages, so skip them after long gaps
+            since = warmup_start if self.watermark is None else max(self.watermark, warmup_start)
+            if since >= until:
+                return
+            for chunk in data_generator.iter_telemetry(since, until, machines=self.machines):
+                self.update_readings(chunk)
+            cycles = data_generator.generate_cycle_events(since, until, machines=self.machines,
+                                                          carry=self._cycle_carry)
+            # Fold long windows hour by hour so the fast and slow averages separate as they would live
+            for _, batch in cycles.groupby(cycles['end'].dt.floor('h'), sort=True):
+                self.update_cycles(batch)
+            self.watermark = until
+
+    def features(self):
+        """Current feature matrix as a DataFrame indexed by machine"""
+        with self._lock:
+            s = self.state
+            return pd.DataFrame({
+                'vibration_rms': np.sqrt(s['vibration_sq']),
+                'vibration_trend': s['vibration_fast'] - s['vibration_slow'],
+                'temperature_drift': s['temperature_fast'] - s['temperature_slow'],
+                'error_frequency': s['error'],
+                'cycle_time_creep': s['cycle_fast'] - s['cycle_slow'],
+                'defect_rate': s['defect'] * 100
+            }, index=pd.Index(self.machines, name='machine'))
+
+
+class LogisticRiskModel:
+    """Lightweight linear-logistic failure risk model over the maintenance features
+
+    Any object with the same predict(features) -> (risk, remaining_days) signature,
+    taking and returning NumPy arrays, can replace it in MaintenancePredictor.
+    """
+
+    def __init__(self, weights=None, bias=-6.5, max_life_days=45):
+        self.weights = weights or {
+            'vibration_rms': 0.8,
+            'vibration_trend': 2.0,
+            'temperature_drift': 0.3,
+            'error_frequency': 6.0,
+            'cycle_time_creep': 0.4,
+            'defect_rate': 0.05
+        }
+        self.bias = bias
+        self.max_life_days = max_life_days
+
+    def predict(self, features):
+        coefficients = np.array([self.weights.get(name, 0.0) for name in FEATURES])
+        logits = np.nan_to_num(features) @ coefficients + self.bias
+        risk = 1 / (1 + np.exp(-logits))
+        return risk, self.max_life_days * (1 - risk)
+
+
+class MaintenancePredictor:
+    """Batch-scores every machine's failure risk and remaining useful life in one model call"""
+
+    def __init__(self, machines, model=None):
+        self.pipeline = FeaturePipeline(machines)
+        self.model = model or LogisticRiskModel()
+
+    def score(self, data_generator=None):
+        """Refresh the features (if a data source is given) and score the whole fleet"""
+        if data_generator is not None:
+            self.pipeline.ingest_since(data_generator)
+        features = self.pipeline.features()
+        risk, remaining_days = self.model.predict(features[FEATURES].to_numpy(dtype=float))
+        return features.assign(risk=risk, remaining_useful_life_days=remaining_days)
@@ -0,0 +1,136 @@
+import sys
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+import pandas as pd
+
+
+def estimate_size(value):
+    """Approximate memory footprint of a cached result in bytes"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    elif isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class QueryCache:
+    """LRU cache of query results bounded by entry count and memory, invalidated by time range"""
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()  # key -> (value, start, end, size)
+        self._total_bytes = 0
+        self._data_version = 0
+        self._invalidations = deque(maxlen=128)  # (version, start, end) of recent invalidations
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(kind, metric, machines, start, end, resolution='day'):
+        """Build a cache key from the query parameters"""
+        machines = tuple(sorted(machines)) if machines else ()
+        return (kind, metric, machines, start, end, resolution)
+
+    def get_or_compute(self, key, start, end, compute):
+        """Return the cached result for key, computing and storing it on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            version = self._data_version
+
+        value = compute()
+
+        with self._lock:
+            if not self._invalidated_since(version, start, end):
+                self._store(key, value, start, end)
+        return value
+
+    def _invalidated_since(self, version, start, end):
+        """Whether data landed in [start, end] after the given data version was read"""
+        if version == self._data_version:
+            return False
+        if not self._invalidations or self._invalidations[0][0] > version + 1:
+            # The log no longer reaches back far enough to tell, so assume the worst
+            return True
+        return any(inv_version > version and inv_start <= end and start <= inv_end
+                   for inv_version, inv_start, inv_end in self._invalidations)
+
+    def _store(self, key, value, start, end):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._total_bytes -= self._entries.pop(key)[3]
+        self._entries[key] = (value, start, end, size)
+        self._total_bytes += size
+
+        while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+            _, (_, _, _, evicted_size) = self._entries.popitem(last=False)
+            self._total_bytes -= evicted_size
+
+    def invalidate(self, start, end):
+        """Drop every entry whose range overlaps [start, end] because new data landed there"""
+        with self._lock:
+            self._data_version += 1
+            self._invalidations.append((self._data_version, start, end))
+            stale = [key for key, (_, entry_start, entry_end, _) in self._entries.items()
+                     if entry_start <= end and start <= entry_end]
+            for key in stale:
+                self._total_bytes -= self._entries.pop(key)[3]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._data_version += 1
+            self._invalidations.clear()
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def get_stats(self):
+        """Get cache size and hit statistics"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'data_version': self._data_version
+            }
+
+
+def cached_daily_query(cache, kind, metric, machines, start_date, end_date, compute):
+    """Run a daily-resolution query through the cache, splitting off today's tail
+
+    compute(start_date, end_date) returns a DataFrame covering the inclusive date range.
+    Days before today are cached under their own key, so only the part of the range that
+    includes today is recomputed once new live data invalidates it.
+    """
+    today = datetime.now().date()
+    parts = []
+
+    if start_date < today:
+        historical_end = min(end_date, today - timedelta(days=1))
+        key = QueryCache.make_key(kind, metric, machines, start_date, historical_end)
+        parts.append(cache.get_or_compute(key, start_date, historical_end,
+                                          lambda: compute(start_date, historical_end)))
+
+    if end_date >= today:
+        tail_start = max(start_date, today)
+        key = QueryCache.make_key(kind, metric, machines, tail_start, end_date)
+        parts.append(cache.get_or_compute(key, tail_start, end_date,
+                                          lambda: compute(tail_start, end_date)))
+
+    if not parts:
+        return pd.DataFrame()
+    if len(parts) == 1:
+        return parts[0]
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,105 @@
+import os
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from utils import local_datetimes
+
+DEFAULT_STORE_DIR = "data"
+
+# Time column each table is partitioned by
+TABLES = {
+    'telemetry': 'timestamp',
+    'downtime': 'start_time',
+    'cycles': 'start',
+    'alerts': 'created_at'
+}
+
+
+class TelemetryStore:
+    """Day-partitioned columnar store for telemetry, downtime events, production cycles and alerts
+
+    Every append writes one uncompressed .npz file per day touched into
+    <root>/<table>/<YYYY-MM-DD>/, so readers only open the partitions of the requested
+    range. Alert created_at values are epoch seconds, all other time columns are datetime64.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _partition_dir(self, table, day):
+        return os.path.join(self.root, table, day.isoformat())
+
+    def _day_values(self, table, frame):
+        times = frame[TABLES[table]]
+        if table == 'alerts':
+            return local_datetimes(times.to_numpy()).astype('datetime64[D]').astype(object)
+        return pd.to_datetime(times).dt.date.to_numpy()
+
+    def append(self, table, frame):
+        """Append a DataFrame to a table, returning the number of rows written"""
+        if table not in TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        if frame.empty:
+            return 0
+
+        days = self._day_values(table, frame)
+        unique_days = sorted(set(days))
+
+        with self._lock:
+            for day in unique_days:
+                part = frame[days == day] if len(unique_days) > 1 else frame
+                directory = self._partition_dir(table, day)
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, f"part-{len(os.listdir(directory)):05d}.npz")
+                np.savez(path, **{column: self._to_array(part[column]) for column in part.columns})
+        return len(frame)
+
+    @staticmethod
+    def _to_array(series):
+        values = series.to_numpy()
+        if values.dtype == object or not isinstance(values.dtype, np.dtype):
+            return values.astype(str)
+        return values
+
+    def days(self, table):
+        """List the days that have data for a table"""
+        directory = os.path.join(self.root, table)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(datetime.strptime(name, "%Y-%m-%d").date() for name in os.listdir(directory))
+
+    def iter_chunks(self, table, start_date, end_date, machines=None):
+        """Yield stored DataFrame chunks of a table for an inclusive date range, oldest first"""
+        for day in self.days(table):
+            if not start_date <= day <= end_date:
+                continue
+            directory = self._partition_dir(table, day)
+            for name in sorted(os.listdir(directory)):
+                with np.load(os.path.join(directory, name), allow_pickle=False) as data:
+                    chunk = pd.DataFrame({column: data[column] for column in data.files})
+                if machines is not None:
+                    chunk = chunk[chunk['machine'].isin(machines)]
+                if not chunk.empty:
+                    yield chunk
+
+    def read(self, table, start_date, end_date, machines=None):
+        """Read a whole table range into one DataFrame"""
+        chunks = list(self.iter_chunks(table, start_date, end_date, machines))
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True)
+
+    def row_counts(self):
+        """Count stored rows per table"""
+        counts = {}
+        for table in TABLES:
+            counts[table] = 0
+            for day in self.days(table):
+                directory = self._partition_dir(table, day)
+                for name in os.listdir(directory):
+                    with np.load(os.path.join(directory, name), allow_pickle=False) as data:
+                        counts[table] += len(data[data.files[0]])
+        return counts
+
@@ -0,0 +1,80 @@
+import json
+import time
+from alert_scheduler import AlertScheduler, JsonlFileSink, WebhookSink, WebhookStub
+from alert_system import AlertSystem
+from data_generator import ManufacturingDataGenerator
+
+
+class FailingPredictor:
+    def __init__(self, failures):
+        self.failures = failures
+
+    def score(self, data_generator):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("model unavailable")
+        raise KeyError("still broken")
+
+
+class FailingGenerator(ManufacturingDataGenerator):
+    def generate_current_data(self):
+        raise ConnectionError("historian offline")
+
+
+class FailingSink:
+    def send(self, alerts):
+        raise OSError("disk full")
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_evaluation_errors_do_not_stop_the_scheduler():
+    scheduler = AlertScheduler(AlertSystem(), FailingGenerator(), interval_seconds=0.01)
+    scheduler.start()
+    try:
+        assert wait_for(lambda: scheduler.failed_evaluations >= 3)
+        assert scheduler.is_running()
+        assert "ConnectionError: historian offline" in scheduler.evaluation_error
+    finally:
+        scheduler.stop()
+
+
+def test_threshold_alerts_delivered_while_maintenance_scoring_fails():
+    alert_system = AlertSystem()
+    alert_system.update_thresholds({'temp_high': -1000.0})  # Every machine alerts on every evaluation
+    scheduler = AlertScheduler(alert_system, ManufacturingDataGenerator(), interval_seconds=0.01,
+                               maintenance_predictor=FailingPredictor(2))
+    scheduler.start()
+    try:
+        assert wait_for(lambda: scheduler.failed_maintenance >= 3)
+    finally:
+        scheduler.stop()
+
+    assert scheduler.feed.latest
+    assert scheduler.failed_evaluations == 0 and scheduler.evaluations >= 3
+    assert "KeyError" in scheduler.maintenance_error
+
+
+def test_alerts_reach_every_sink_despite_a_failing_one(tmp_path):
+    stub = WebhookStub(port=0).start()
+    log_path = tmp_path / "alerts.jsonl"
+    scheduler = AlertScheduler(AlertSystem(), ManufacturingDataGenerator(),
+                               sinks=[FailingSink(), JsonlFileSink(str(log_path)), WebhookSink(stub.url)])
+    try:
+        alerts = []
+        while not alerts:
+            alerts = scheduler.evaluate()
+    finally:
+        stub.stop()
+
+    assert scheduler.feed.latest == alerts
+    assert len(log_path.read_text().splitlines()) == len(alerts)
+    assert len(stub.received[-1]['alerts']) == len(alerts)
+    assert json.loads(log_path.read_text().splitlines()[0])['machine'] == alerts[0].machine
+    assert "disk full" in scheduler.sink_errors["FailingSink"]
+    assert scheduler.get_latency_stats()['alerts'] == len(alerts)
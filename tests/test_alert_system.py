@@ -0,0 +1,79 @@
+import math
+import threading
+from datetime import datetime
+import pytest
+from alert_system import (AlertSystem, AlertRecord, ALERT_KINDS, machine_code, OEE_LOW, TEMP_HIGH, MACHINE_ERROR,
+                          MATERIAL_LOW, MAINTENANCE_RISK)
+
+CREATED_AT = datetime(2026, 3, 2, 14, 5, 9).timestamp()
+
+
+def test_message_formats_value_and_threshold():
+    alert = AlertRecord(TEMP_HIGH, "Line-A-Press-01", 81.26, 75.0, CREATED_AT)
+
+    assert alert.message == "Temperature is 81.3°C, exceeding 75.0°C threshold"
+    assert alert.severity == 'Warning' and alert.metric == 'Temperature'
+    assert alert.title == ALERT_KINDS[TEMP_HIGH].title
+    assert AlertRecord(MAINTENANCE_RISK, "M1", 0.734, 0.5).message == \
+        "Predicted failure risk is 73%, above 50% threshold"
+
+
+def test_display_value_uses_label_when_kind_has_one():
+    assert AlertRecord(MATERIAL_LOW, "Line-A-Press-01")['value'] == 'Low'
+    assert AlertRecord(MACHINE_ERROR, "M1")['value'] == 'Error'
+    assert AlertRecord(OEE_LOW, 'All Lines', 55.5, 60.0)['value'] == 55.5
+    assert math.isnan(AlertRecord(TEMP_HIGH, "M1").display_value)
+
+
+def test_to_dict_renders_every_field():
+    alert = AlertRecord(OEE_LOW, 'All Lines', 55.5, 60.0, CREATED_AT)
+    rendered = alert.to_dict()
+
+    assert list(rendered) == list(AlertRecord.FIELDS)
+    assert rendered['machine'] == 'All Lines'
+    assert rendered['timestamp'] == "14:05:09"
+    assert rendered['created_at'] == datetime(2026, 3, 2, 14, 5, 9)
+    assert rendered['message'] == "OEE has dropped to 55.5%, below threshold of 60.0%"
+
+
+def test_getitem_unknown_field_raises_key_error():
+    alert = AlertRecord(TEMP_HIGH, "M1", 80.0, 75.0)
+
+    with pytest.raises(KeyError):
+        alert['machine_code']
+    with pytest.raises(KeyError):
+        alert['nonexistent']
+
+
+def test_machine_codes_unique_under_concurrent_registration():
+    names = [f"Concurrent-{i}" for i in range(200)]
+    barrier = threading.Barrier(8)
+    results = []
+
+    def register():
+        barrier.wait()
+        results.append([machine_code(name) for name in names])
+
+    threads = [threading.Thread(target=register) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(codes == results[0] for codes in results)
+    assert len(set(results[0])) == len(names)
+    assert [AlertRecord(TEMP_HIGH, name).machine for name in names] == names
+
+
+def test_trim_history_drops_only_expired_prefix():
+    alert_system = AlertSystem()
+    alert_system.alert_history = [AlertRecord(TEMP_HIGH, "M1", 80.0, 75.0, created_at=t) for t in range(10)]
+
+    alert_system._trim_history(3)
+    assert [alert.created_at for alert in alert_system.alert_history] == list(range(4, 10))
+
+    alert_system._trim_history(-1)
+    assert len(alert_system.alert_history) == 6
+
+    alert_system._trim_history(100)
+    assert alert_system.alert_history == []
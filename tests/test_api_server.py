@@ -0,0 +1,64 @@
+import json
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+import pandas as pd
+import pytest
+from api_server import LiveState, ApiServer
+from data_generator import ManufacturingDataGenerator
+
+
+@pytest.fixture
+def state():
+    state = LiveState(ManufacturingDataGenerator(), history_hours=1)
+    state.refresh()
+    return state
+
+
+def get(server, path, etag=None):
+    request = urllib.request.Request(server.url + path, headers={'If-None-Match': etag} if etag else {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers['ETag'], json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, error.headers.get('ETag'), error.read()
+
+
+def test_etag_not_modified_until_resource_changes(state):
+    server = ApiServer(state, port=0).start()
+    try:
+        status, etag, body = get(server, "/api/kpis")
+        assert status == 200 and body['version'] == state.kpis_version
+        assert get(server, "/api/kpis", etag)[0] == 304
+
+        state.refresh()
+        assert get(server, "/api/kpis", etag)[0] == 200
+        assert get(server, "/api/nope")[0] == 404
+        assert get(server, "/api/timeseries?machine=unknown")[0] == 400
+    finally:
+        server.stop()
+
+
+def test_fleet_delta_since_version(state):
+    version = state.version
+    assert len(state.render('/api/fleet', {})['machines']) == len(state.machines)
+    assert state.render('/api/fleet', {'since': str(version)})['machines'] == {}
+
+    state.refresh()
+    delta = state.render('/api/fleet', {'since': str(version)})
+    assert delta['version'] == version + 1 and not delta['full']
+    assert set(delta['machines']) <= set(state.machines)
+
+
+def test_history_is_bounded_by_history_hours():
+    state = LiveState(ManufacturingDataGenerator(), history_hours=1)
+    end = datetime.now()
+    for chunk in state.data_generator.iter_telemetry(end - timedelta(hours=6), end, machines=state.machines):
+        state.history.append(chunk)
+    assert pd.Timestamp(state.history.blocks[state.machines[0]][0].start) < end - timedelta(hours=5)
+
+    state.refresh()
+    cutoff = state.last_refresh - timedelta(hours=1)
+    blocks = [block for machine_blocks in state.history.blocks.values() for block in machine_blocks]
+    assert all(pd.Timestamp(block.end) >= cutoff for block in blocks)
+    assert state.history.samples <= len(state.machines) * (60 + state.history.block_rows)
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+from backtest import ThresholdBacktester
+from alert_system import AlertSystem, ALERT_KINDS, SEVERITIES, evaluate_readings
+from data_generator import ManufacturingDataGenerator
+from utils import local_datetimes
+
+START = datetime(2026, 1, 1)
+DEFAULTS = AlertSystem().thresholds
+TIGHTENED = {**DEFAULTS, 'temp_high': 70.0, 'temp_low': 30.0, 'vibration_high': 3.0,
+             'production_low': 80, 'efficiency_low': 85.0}
+
+
+@pytest.fixture(scope="module")
+def readings():
+    data_generator = ManufacturingDataGenerator()
+    return pd.concat(list(data_generator.iter_telemetry(START, START + timedelta(days=2), interval_minutes=5,
+                                                        seed=3)), ignore_index=True)
+
+
+def expected_counts(readings, thresholds):
+    """Alert counts per (machine, date, severity) from the live evaluation rules"""
+    alerts = evaluate_readings(readings, thresholds)
+    return pd.DataFrame({
+        'machine': alerts['machine'],
+        'date': local_datetimes(alerts['created_at'].to_numpy()).astype('datetime64[D]'),
+        'severity': [ALERT_KINDS[kind].severity for kind in alerts['kind']]
+    }).value_counts().to_dict()
+
+
+def backtest_counts(backtester, thresholds):
+    counts = backtester.run(thresholds)
+    counts = counts[counts['alerts'] > 0]
+    return {(machine, np.datetime64(date, 'D'), severity): alerts
+            for machine, date, severity, alerts in counts.itertuples(index=False)}
+
+
+@pytest.mark.parametrize("thresholds", [DEFAULTS, TIGHTENED], ids=["default", "tightened"])
+def test_counts_match_evaluate_readings(readings, thresholds):
+    backtester = ThresholdBacktester([readings], ManufacturingDataGenerator().machines)
+
+    expected = expected_counts(readings, thresholds)
+    assert sum(expected.values()) > 0
+    assert backtest_counts(backtester, thresholds) == expected
+
+
+def test_tightened_thresholds_raise_more_alerts(readings):
+    backtester = ThresholdBacktester([readings], ManufacturingDataGenerator().machines)
+    default_rate, tightened_rate = backtester.daily_rate(DEFAULTS), backtester.daily_rate(TIGHTENED)
+
+    assert list(default_rate.index) == SEVERITIES
+    assert (tightened_rate >= default_rate).all() and tightened_rate.sum() > default_rate.sum()
+
+
+def test_reading_equal_to_threshold_does_not_alert():
+    times = [START + timedelta(minutes=i) for i in range(4)] + [START + timedelta(days=1)]
+    readings = pd.DataFrame({
+        'timestamp': times,
+        'machine': ["M1", "M1", "M1", "M2", "M2"],
+        'status': ["Running"] * 4 + ["Error"],
+        'temperature': [75.0, 75.5, 25.0, 75.0, 24.5],
+        'vibration': [5.0, 1.0, 1.0, 5.0, 5.5],
+        'production_rate': [50.0, 49.0, 60.0, 60.0, 60.0],
+        'efficiency': [70.0, 80.0, 69.9, 80.0, 70.0]
+    })
+    backtester = ThresholdBacktester([readings], ["M1", "M2"])
+
+    expected = expected_counts(readings, DEFAULTS)
+    assert backtest_counts(backtester, DEFAULTS) == expected
+    assert expected == {
+        ("M1", np.datetime64('2026-01-01'), 'Warning'): 2,  # 75.5°C and 49 units/h
+        ("M1", np.datetime64('2026-01-01'), 'Major'): 1,    # 69.9% efficiency
+        ("M2", np.datetime64('2026-01-02'), 'Info'): 1,     # 24.5°C
+        ("M2", np.datetime64('2026-01-02'), 'Critical'): 2  # 5.5mm/s and the error status
+    }
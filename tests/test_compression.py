@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+from compression import (TelemetryHistory, METRICS, encode_timestamps, decode_timestamps,
+                         encode_floats_xor, decode_floats_xor, encode_floats_quantized, decode_floats_quantized)
+
+
+def make_readings(start="2026-01-01", periods=1000, freq="1min", machines=("M1", "M2"), seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(start, periods=periods, freq=freq)
+    frames = []
+    for machine in machines:
+        frames.append(pd.DataFrame({
+            'timestamp': times,
+            'machine': machine,
+            'status': rng.choice(["Running", "Idle", "Error"], periods),
+            'temperature': 45 + np.cumsum(rng.normal(0, 0.1, periods)),
+            'vibration': np.abs(rng.normal(2.5, 1.0, periods)),
+            'production_rate': rng.normal(120, 15, periods),
+            'efficiency': rng.uniform(0, 100, periods)
+        }))
+    return pd.concat(frames, ignore_index=True).sort_values('timestamp', kind='stable', ignore_index=True)
+
+
+def test_xor_is_bit_exact():
+    values = np.concatenate([np.random.default_rng(0).normal(50, 10, 5000), [0.0, -0.0, np.nan, np.inf, 1e-300]])
+    decoded = decode_floats_xor(encode_floats_xor(values), len(values))
+    np.testing.assert_array_equal(decoded.view(np.uint64), values.view(np.uint64))
+
+
+@pytest.mark.parametrize("precision", [0.01, 0.5])
+def test_quantized_within_half_precision(precision):
+    values = np.random.default_rng(1).normal(50, 10, 5000)
+    decoded = decode_floats_quantized(encode_floats_quantized(values, precision), len(values), precision)
+    assert np.abs(decoded - values).max() <= precision / 2 + 1e-9
+
+
+def test_quantized_rejects_non_finite():
+    with pytest.raises(ValueError):
+        encode_floats_quantized(np.array([1.0, np.nan]))
+
+
+def test_timestamps_survive_irregular_sampling():
+    rng = np.random.default_rng(2)
+    gaps = rng.integers(1, 10**9, 3000).astype('timedelta64[ns]')
+    gaps[100:110] = np.timedelta64(3600, 's')  # An outage
+    times = np.datetime64("2026-03-29T00:00:00", 'ns') + np.cumsum(gaps)
+    np.testing.assert_array_equal(decode_timestamps(encode_timestamps(times), len(times)), times)
+
+
+@pytest.mark.parametrize("count", [0, 1, 2])
+def test_timestamps_short_series(count):
+    times = pd.date_range("2026-01-01", periods=count, freq="1min").to_numpy()
+    np.testing.assert_array_equal(decode_timestamps(encode_timestamps(times), count), times)
+
+
+@pytest.mark.parametrize("encoding", [None, 'xor', 'quantized'])
+def test_read_window_across_sealed_and_open_blocks(encoding):
+    readings = make_readings(periods=1000)
+    history = TelemetryHistory(block_rows=300, encoding=encoding)
+    for bounds in np.array_split(np.arange(len(readings)), 7):
+        history.append(readings.iloc[bounds])
+
+    # 1000 readings per machine: three sealed blocks and 100 readings still open
+    assert [len(history.blocks["M1"]), history.samples] == [3, 2 * 900]
+
+    start, end = pd.Timestamp("2026-01-01 04:10"), pd.Timestamp("2026-01-01 16:05")
+    window = history.read("M1", start, end)
+    expected = readings[(readings['machine'] == "M1") & (readings['timestamp'] >= start)
+                        & (readings['timestamp'] < end)].reset_index(drop=True)
+
+    np.testing.assert_array_equal(window['timestamp'].to_numpy(), expected['timestamp'].to_numpy())
+    assert list(window['status'].astype(str)) == list(expected['status'])
+    tolerance = 0.005 + 1e-9 if encoding == 'quantized' else 0
+    for metric in METRICS:
+        np.testing.assert_allclose(window[metric].to_numpy(), expected[metric].to_numpy(), rtol=0, atol=tolerance)
+
+
+def test_flush_seals_partial_blocks_and_compresses():
+    readings = make_readings(periods=1000)
+    raw, compressed = TelemetryHistory(encoding=None), TelemetryHistory(encoding='xor')
+    for history in (raw, compressed):
+        history.append(readings)
+        history.flush()
+        assert history.samples == len(readings)
+        assert history.read("M2").shape[0] == 1000
+    assert compressed.nbytes < raw.nbytes
+
+
+def test_unknown_encoding():
+    with pytest.raises(ValueError):
+        TelemetryHistory(encoding='gzip')
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from correlation_engine import CorrelationEngine
+
+
+def make_engine(**kwargs):
+    return CorrelationEngine(["A", "B"], metrics=['temperature'], window=240, max_lag=5, **kwargs)
+
+
+def lagged_pair(shift, steps=1500, seed=0):
+    """Columns A and B where B repeats A `shift` steps later"""
+    x = np.random.default_rng(seed).normal(size=steps + shift)
+    return np.column_stack([x[shift:], x[:steps]])
+
+
+def test_lag_sign_convention():
+    engine = make_engine()
+    engine.update(lagged_pair(3))
+
+    from_a = engine.top_correlated("A", 'temperature', min_abs=0.5)
+    from_b = engine.top_correlated("B", 'temperature', min_abs=0.5)
+
+    # B follows A by three steps, so A sees +3 and B sees A leading at -3
+    assert from_a[0]['machine'] == "B" and from_a[0]['lag_minutes'] == 3
+    assert from_b[0]['machine'] == "A" and from_b[0]['lag_minutes'] == -3
+    assert from_a[0]['correlation'] > 0.9 and from_b[0]['correlation'] > 0.9
+
+
+def test_lag_scaled_by_interval():
+    engine = make_engine(interval_minutes=5)
+    engine.update(lagged_pair(2))
+
+    assert engine.top_correlated("A", 'temperature')[0]['lag_minutes'] == 10
+
+
+def test_update_treats_missing_readings_as_mean():
+    data = lagged_pair(0, steps=1000)
+    gappy = data.copy()
+    gappy[::10, 1] = np.nan
+    engine = make_engine()
+    engine.update(gappy)
+
+    assert np.isfinite(engine.covariances).all() and np.isfinite(engine.mean).all()
+    assert engine.correlation_matrix()[0, 1] > 0.85
+
+
+def test_update_all_missing_first_batch():
+    engine = make_engine()
+    engine.update(np.array([[np.nan, 1.0], [np.nan, 2.0]]))
+
+    assert engine.mean[0] == pytest.approx(0.0, abs=1e-12)
+    assert np.isfinite(engine.covariances).all()
+    engine.update([[np.nan, 3.0]])  # A single 1-D observation is one step
+    assert engine.steps == 3
+
+
+def test_update_readings_sets_watermark():
+    times = pd.date_range("2026-01-01 08:00", periods=3, freq="min")
+    readings = pd.DataFrame({'timestamp': times.repeat(2), 'machine': ["A", "B"] * 3,
+                             'temperature': [50.0, 60.0, 51.0, 61.0, 52.0, 62.0]})
+    engine = make_engine()
+    engine.update_readings(readings)
+
+    assert engine.steps == 3
+    assert engine.watermark == pd.Timestamp("2026-01-01 08:03")
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+from cycle_stats import QuantileSketch, CycleStatistics
+from data_generator import ManufacturingDataGenerator
+
+
+@pytest.mark.parametrize("relative_accuracy", [0.01, 0.02])
+def test_quantile_relative_error(relative_accuracy):
+    values = np.random.default_rng(0).lognormal(3.8, 0.4, 100000)
+    sketch = QuantileSketch(relative_accuracy)
+    sketch.update(values)
+
+    assert sketch.count == len(values)
+    for q in (0.01, 0.25, 0.5, 0.9, 0.95, 0.99):
+        exact = np.quantile(values, q, method='lower')
+        assert abs(sketch.quantile(q) - exact) <= relative_accuracy * exact * 1.001
+
+
+def test_merge_matches_single_sketch():
+    values = np.random.default_rng(1).normal(45, 8, 20000).clip(5)
+    whole = QuantileSketch()
+    whole.update(values)
+
+    merged = QuantileSketch()
+    for part in np.array_split(values, 7):
+        sketch = QuantileSketch()
+        sketch.update(part)
+        merged.merge(sketch)
+
+    np.testing.assert_array_equal(merged.bucket_counts, whole.bucket_counts)
+    assert (merged.count, merged.min, merged.max) == (whole.count, whole.min, whole.max)
+    assert merged.total == pytest.approx(whole.total)
+    for q in (0.5, 0.95, 0.99):
+        assert merged.quantile(q) == whole.quantile(q)
+
+
+def test_merge_rejects_different_parameters():
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+def test_empty_sketch_is_nan():
+    assert np.isnan(QuantileSketch().quantile(0.5))
+
+
+def test_add_cycles_groups_by_scope():
+    cycles = pd.DataFrame({
+        'machine': ["Line-A-Press-01", "Line-A-Assembly-02", "Line-B-Welding-03"],
+        'start': pd.to_datetime(["2026-01-01 07:00", "2026-01-01 15:00", "2026-01-01 23:00"]),
+        'end': pd.to_datetime(["2026-01-01 07:01", "2026-01-01 15:01", "2026-01-01 23:01"]),
+        'duration': [40.0, 50.0, 60.0]
+    })
+    statistics = CycleStatistics()
+    statistics.add_cycles(cycles)
+
+    assert statistics.get_count('line', 'Line-A') == 2
+    assert statistics.get_count('shift', 'Night Shift') == 1
+    assert statistics.get_percentiles('machine', "Line-B-Welding-03")[0.5] == pytest.approx(60, rel=0.01)
+
+
+def test_short_ingest_windows_count_every_cycle():
+    data_generator = ManufacturingDataGenerator()
+    statistics = CycleStatistics()
+    now = datetime(2026, 1, 1, 8)
+    statistics.ingest_since(data_generator, now)
+
+    ingested = 0
+    for _ in range(4 * 180):  # Four hours of 20 second refreshes, well under a cycle's ~45 s
+        now += timedelta(seconds=20)
+        ingested += statistics.ingest_since(data_generator, now)
+
+    expected = 4 * 4 * len(data_generator.machines)
+    assert 0.5 * expected < ingested < 1.5 * expected
+
+
+def test_ingest_resets_at_midnight():
+    data_generator = ManufacturingDataGenerator()
+    statistics = CycleStatistics()
+    statistics.ingest_since(data_generator, datetime(2026, 1, 1, 23))
+    assert statistics.get_count('shift', 'Day Shift') > 0
+
+    statistics.ingest_since(data_generator, datetime(2026, 1, 2, 3))
+    assert statistics.get_count('shift', 'Day Shift') == 0
+    assert statistics.get_count('shift', 'Night Shift') > 0
@@ -0,0 +1,104 @@
+import time
+from datetime import datetime, timedelta
+import pandas as pd
+import pytest
+from export import iter_alert_chunks, iter_record_chunks, write_csv, export_dataset, ShiftReportScheduler
+from alert_system import AlertSystem, AlertRecord, TEMP_HIGH, MATERIAL_LOW
+from data_generator import ManufacturingDataGenerator
+
+START = datetime(2026, 1, 1)
+
+
+def make_alert_system(count, machines=("Line-A", "Line-B")):
+    alert_system = AlertSystem()
+    for i in range(count):
+        kind = MATERIAL_LOW if i % 5 == 0 else TEMP_HIGH
+        created_at = (START + timedelta(minutes=i)).timestamp()
+        alert_system.alert_history.append(AlertRecord(kind, machines[i % len(machines)], 80.0 + i, 75.0, created_at))
+    return alert_system
+
+
+def test_record_chunks_bounded():
+    chunks = list(iter_record_chunks(({'i': i} for i in range(25)), chunk_rows=10))
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert pd.concat(chunks)['i'].tolist() == list(range(25))
+
+
+def test_alert_chunks_filter_range_and_machines():
+    alert_system = make_alert_system(100)
+    end = START + timedelta(minutes=60)
+    chunks = list(iter_alert_chunks(alert_system, START + timedelta(minutes=10), end, ["Line-A"], chunk_rows=7))
+    frame = pd.concat(chunks)
+
+    assert all(len(chunk) <= 7 for chunk in chunks)
+    assert len(frame) == 25  # Even minutes 10..58
+    assert set(frame['machine']) == {"Line-A"}
+    assert frame['created_at'].min() >= START + timedelta(minutes=10)
+    assert frame['created_at'].max() < end
+    # Labels and numbers share one string column
+    assert frame['value'].map(type).eq(str).all() and "Low" in set(frame['value'])
+
+
+def test_alert_chunks_empty_selection():
+    alert_system = make_alert_system(20)
+
+    assert list(iter_alert_chunks(alert_system, START, START + timedelta(hours=1), machines=[])) == []
+
+
+def test_csv_header_written_once(tmp_path):
+    path = tmp_path / "alerts.csv"
+    rows = export_dataset('alerts', str(path), START, START + timedelta(hours=1), None,
+                          make_alert_system(50), chunk_rows=8)
+
+    lines = path.read_text().splitlines()
+    assert rows == 50 and len(lines) == 51
+    assert sum(line.startswith("severity,") for line in lines) == 1
+
+
+def test_csv_empty_selection_writes_empty_file(tmp_path):
+    path = tmp_path / "downtime.csv"
+    rows = export_dataset('downtime', str(path), START, START + timedelta(days=1),
+                          ManufacturingDataGenerator(), machines=[])
+
+    assert rows == 0 and path.read_text() == ""
+
+
+def test_parquet_row_group_per_chunk(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "alerts.parquet"
+    rows = export_dataset('alerts', str(path), START, START + timedelta(hours=1), None,
+                          make_alert_system(50), fmt='parquet', chunk_rows=16)
+
+    parquet = pq.ParquetFile(str(path))
+    assert rows == 50 and parquet.metadata.num_rows == 50
+    assert [parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)] == [16, 16, 16, 2]
+    assert pd.read_parquet(path)['machine'].tolist()[:2] == ["Line-A", "Line-B"]
+
+
+def test_write_csv_matches_single_frame(tmp_path):
+    frame = pd.DataFrame({'a': range(12), 'b': [f"x{i}" for i in range(12)]})
+    path = tmp_path / "frame.csv"
+    write_csv((frame.iloc[i:i + 5] for i in range(0, 12, 5)), path)
+
+    pd.testing.assert_frame_equal(pd.read_csv(path), frame)
+
+
+def test_report_scheduler_records_failures(tmp_path, monkeypatch):
+    scheduler = ShiftReportScheduler(str(tmp_path), ManufacturingDataGenerator())
+    now = datetime.now()
+    monkeypatch.setattr("export.get_shift_window",
+                        lambda when: ("Day", now - timedelta(hours=8), now - timedelta(seconds=1)))
+
+    def failing_report(shift_name, shift_start, shift_end):
+        raise OSError("disk full")
+
+    scheduler.write_report = failing_report
+    scheduler.start()
+    deadline = time.time() + 5
+    while scheduler.failed_reports < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    scheduler.stop()
+
+    assert scheduler.failed_reports >= 2
+    assert "OSError: disk full" in scheduler.report_error
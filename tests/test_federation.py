@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import subprocess
+import sys
+from datetime import datetime, timedelta
+import pytest
+from federation import PlantRollup, COUNTERS, build_rollup, publish_rollup, load_rollups, RollupPublisher
+from alert_system import AlertSystem
+from data_generator import ManufacturingDataGenerator
+
+FEDERATION_SCRIPT = os.path.join(os.path.dirname(__file__), os.pardir, "federation.py")
+START = datetime(2026, 1, 1)
+END = START + timedelta(hours=24)
+
+
+def make_rollup(plant, run_minutes, actual_units, good_cycles, generated_at=None):
+    counters = {
+        'readings': 1440, 'planned_minutes': 1440, 'run_minutes': run_minutes,
+        'ideal_units': 1000, 'actual_units': actual_units, 'total_cycles': 100, 'good_cycles': good_cycles
+    }
+    return PlantRollup([plant], START, END, counters,
+                       downtime_minutes={'Tool Change': 30}, downtime_events={'Tool Change': 1},
+                       alerts={'Critical': 1, 'Info': 2}, generated_at=generated_at or END)
+
+
+def test_combine_sums_counters():
+    rollups = [make_rollup("A", 1440, 900, 90), make_rollup("B", 720, 500, 50), make_rollup("C", 360, 1000, 100)]
+    merged = PlantRollup.combine(rollups)
+
+    assert merged.plants == ["A", "B", "C"]
+    for name in COUNTERS:
+        assert merged.counters[name] == sum(rollup.counters[name] for rollup in rollups)
+    assert merged.downtime_minutes == {'Tool Change': 90}
+    assert merged.downtime_events == {'Tool Change': 3}
+    assert merged.alerts['Critical'] == 3 and merged.alerts['Info'] == 6
+
+
+def test_oee_derived_from_merged_counts_not_averaged():
+    a, b = make_rollup("A", 1440, 900, 90), make_rollup("B", 360, 500, 50)
+    merged = PlantRollup.combine([a, b])
+
+    availability = 100 * (1440 + 360) / (1440 + 1440)
+    performance = 100 * (900 + 500) / 2000
+    quality = 100 * (90 + 50) / 200
+    assert merged.oee == pytest.approx(availability * performance * quality / 10000)
+    assert merged.oee != pytest.approx((a.oee + b.oee) / 2)
+
+
+def test_combine_is_associative():
+    rollups = [make_rollup(name, 100 * i, 100 * i, 10 * i) for i, name in enumerate("ABCD", 1)]
+    nested = PlantRollup.combine([PlantRollup.combine(rollups[:2]), PlantRollup.combine(rollups[2:])])
+    assert nested.counters == PlantRollup.combine(rollups).counters
+
+
+def test_combine_requires_rollups():
+    with pytest.raises(ValueError):
+        PlantRollup.combine([])
+
+
+def test_round_trip_through_json():
+    rollup = make_rollup("A", 1000, 900, 90)
+    restored = PlantRollup.from_dict(json.loads(json.dumps(rollup.to_dict())))
+    assert restored.to_dict() == rollup.to_dict()
+
+
+def test_load_rollups_keeps_newest_per_plant_and_reports_bad_files(tmp_path):
+    old_dir, new_dir = tmp_path / "old", tmp_path / "new"
+    publish_rollup(make_rollup("A", 100, 100, 10, generated_at=END), str(old_dir))
+    publish_rollup(make_rollup("A", 200, 200, 20, generated_at=END + timedelta(minutes=5)), str(new_dir))
+    publish_rollup(make_rollup("B", 300, 300, 30), str(old_dir))
+    (new_dir / "broken.rollup.json").write_text("{not json")
+    (new_dir / "future.rollup.json").write_text(json.dumps({'version': 99}))
+
+    rollups, errors = load_rollups([str(old_dir), str(new_dir)])
+
+    by_plant = {rollup.plants[0]: rollup for rollup in rollups}
+    assert sorted(by_plant) == ["A", "B"]
+    assert by_plant["A"].counters['run_minutes'] == 200
+    assert len(errors) == 2
+    assert any("broken.rollup.json" in error for error in errors)
+    assert any("Unsupported rollup version" in error for error in errors)
+
+
+def test_build_rollup_with_empty_alert_history():
+    rollup = build_rollup("A", ManufacturingDataGenerator(), AlertSystem(), window_hours=1)
+    assert sum(rollup.alerts.values()) == 0
+    assert rollup.counters['readings'] > 0
+
+
+def test_publisher_survives_failures(tmp_path):
+    class BrokenGenerator:
+        machine_configs = {}
+
+        def iter_telemetry(self, *args, **kwargs):
+            raise RuntimeError("no data")
+
+    publisher = RollupPublisher(str(tmp_path), "A", BrokenGenerator(), interval_seconds=0.01)
+    publisher.start()
+    try:
+        deadline = datetime.now() + timedelta(seconds=5)
+        while publisher.failed_publishes < 3 and datetime.now() < deadline:
+            time.sleep(0.01)
+        assert publisher.failed_publishes >= 3 and publisher.is_running()
+        assert "no data" in publisher.publish_error
+    finally:
+        publisher.stop()
+
+
+def test_several_local_instances(tmp_path):
+    """Publish from separate processes into one directory, then federate them"""
+    for plant in ("Plant-1", "Plant-2", "Plant-3"):
+        subprocess.run([sys.executable, FEDERATION_SCRIPT, "publish", str(tmp_path), "--plant", plant,
+                        "--window-hours", "1", "--once"], check=True, capture_output=True)
+
+    rollups, errors = load_rollups([str(tmp_path)])
+    merged = PlantRollup.combine(rollups)
+
+    assert errors == []
+    assert sorted(merged.plants) == ["Plant-1", "Plant-2", "Plant-3"]
+    assert merged.counters['readings'] == sum(rollup.counters['readings'] for rollup in rollups)
+    assert 0 < merged.oee < 100
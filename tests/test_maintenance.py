@@ -0,0 +1,113 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from maintenance import _ew_block, FeaturePipeline, LogisticRiskModel, MaintenancePredictor, FEATURES
+from alert_system import AlertSystem
+from data_generator import ManufacturingDataGenerator, CYCLE_VERDICTS
+
+ALPHA = 0.2
+
+
+def sequential_ew(mean, values, alpha):
+    """Reference: fold readings one at a time, skipping NaNs, starting fresh machines from the first reading"""
+    mean = mean.copy()
+    for row in values:
+        for j, value in enumerate(row):
+            if np.isnan(value):
+                continue
+            mean[j] = value if np.isnan(mean[j]) else (1 - alpha) * mean[j] + alpha * value
+    return mean
+
+
+def test_ew_block_matches_sequential_updates():
+    rng = np.random.default_rng(0)
+    mean = np.array([10.0, 20.0, 30.0])
+    values = rng.normal(15, 5, size=(12, 3))
+
+    np.testing.assert_allclose(_ew_block(mean, values, ALPHA), sequential_ew(mean, values, ALPHA))
+
+
+def test_ew_block_skips_missing_readings_per_machine():
+    mean = np.array([10.0, 20.0, 30.0])
+    values = np.array([[12.0, np.nan, np.nan],
+                       [np.nan, 22.0, np.nan],
+                       [14.0, np.nan, np.nan]])
+    updated = _ew_block(mean, values, ALPHA)
+
+    # Machine 0 decays twice and machine 1 once, machine 2 saw nothing and is unchanged
+    assert updated[0] == pytest.approx((1 - ALPHA) ** 2 * 10 + ALPHA * (1 - ALPHA) * 12 + ALPHA * 14)
+    assert updated[1] == pytest.approx((1 - ALPHA) * 20 + ALPHA * 22)
+    assert updated[2] == 30.0
+
+
+def test_ew_block_first_seen_machines_start_from_block_average():
+    mean = np.array([np.nan, 5.0, np.nan])
+    values = np.array([[2.0, 6.0, np.nan],
+                       [4.0, np.nan, np.nan]])
+    updated = _ew_block(mean, values, ALPHA)
+
+    assert updated[0] == pytest.approx(3.0)
+    assert updated[1] == pytest.approx((1 - ALPHA) * 5 + ALPHA * 6)
+    assert np.isnan(updated[2])
+
+
+def make_cycles(machine, durations, failed=0):
+    verdicts = [CYCLE_VERDICTS.index("Fail")] * failed + [CYCLE_VERDICTS.index("Pass")] * (len(durations) - failed)
+    return pd.DataFrame({'machine': machine, 'duration': durations, 'verdict': verdicts})
+
+
+def test_update_cycles_weights_batch_by_count():
+    pipeline = FeaturePipeline(["M1", "M2"], fast_window=9, slow_window=99)
+    pipeline.update_cycles(make_cycles("M1", [100.0] * 4))
+    assert pipeline.state['cycle_fast'][0] == 100.0 and np.isnan(pipeline.state['cycle_fast'][1])
+
+    pipeline.update_cycles(pd.concat([make_cycles("M1", [110.0, 130.0]), make_cycles("M2", [50.0])]))
+    weight = 1 - (1 - pipeline.fast_alpha) ** 2
+    assert pipeline.state['cycle_fast'][0] == pytest.approx(100 + weight * (120 - 100))
+    assert pipeline.state['cycle_slow'][0] < pipeline.state['cycle_fast'][0]
+    assert pipeline.state['cycle_fast'][1] == 50.0
+
+
+def test_defect_rate_counts_failed_cycles_only():
+    pipeline = FeaturePipeline(["M1"])
+    pipeline.update_cycles(make_cycles("M1", [100.0] * 10, failed=2))
+
+    assert pipeline.features().loc["M1", 'defect_rate'] == pytest.approx(20.0)
+
+
+def test_model_output_shape_and_range():
+    features = np.random.default_rng(0).normal(size=(7, len(FEATURES)))
+    features[0, :] = np.nan
+    risk, remaining = LogisticRiskModel(max_life_days=30).predict(features)
+
+    assert risk.shape == remaining.shape == (7,)
+    assert ((risk > 0) & (risk < 1)).all()
+    np.testing.assert_allclose(remaining, 30 * (1 - risk))
+    assert risk[0] == pytest.approx(1 / (1 + np.exp(6.5)))  # Missing features contribute nothing
+
+
+def test_predictor_scores_every_machine():
+    data_generator = ManufacturingDataGenerator()
+    machines = data_generator.get_machine_list()
+    predictor = MaintenancePredictor(machines)
+    predictor.pipeline.ingest_since(data_generator, until=datetime(2026, 1, 1, 12), warmup_hours=2)
+    scores = predictor.score()
+
+    assert list(scores.index) == machines
+    assert list(scores.columns) == FEATURES + ['risk', 'remaining_useful_life_days']
+    assert scores[['risk', 'remaining_useful_life_days']].notna().all().all()
+    assert predictor.pipeline.watermark == datetime(2026, 1, 1, 12)
+
+
+def test_maintenance_alerts_only_on_crossing():
+    alert_system = AlertSystem()
+
+    def scores(**risk):
+        return pd.DataFrame({'risk': list(risk.values())}, index=list(risk))
+
+    assert [a.machine for a in alert_system.check_maintenance_alerts(scores(M1=0.7, M2=0.2))] == ["M1"]
+    assert alert_system.check_maintenance_alerts(scores(M1=0.8, M2=0.3)) == []
+    assert [a.machine for a in alert_system.check_maintenance_alerts(scores(M1=0.4, M2=0.6))] == ["M2"]
+    assert [a.machine for a in alert_system.check_maintenance_alerts(scores(M1=0.9, M2=0.6))] == ["M1"]
+    assert len(alert_system.alert_history) == 3
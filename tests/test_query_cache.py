@@ -0,0 +1,121 @@
+from datetime import date, datetime, timedelta
+import pandas as pd
+from query_cache import QueryCache, cached_daily_query, estimate_size
+
+DAY = date(2026, 1, 10)
+
+
+def fill(cache, days):
+    for offset in days:
+        day = DAY + timedelta(days=offset)
+        cache.get_or_compute(('q', offset), day, day, lambda: pd.DataFrame({'v': range(10)}))
+
+
+def test_lru_evicts_by_entry_count():
+    cache = QueryCache(max_entries=3)
+    fill(cache, [0, 1, 2])
+    cache.get_or_compute(('q', 0), DAY, DAY, lambda: None)  # Hit, so ('q', 1) is now least recent
+    fill(cache, [3])
+
+    assert list(cache._entries) == [('q', 2), ('q', 0), ('q', 3)]
+    assert cache.get_stats()['hits'] == 1
+
+
+def test_lru_evicts_by_bytes():
+    entry_size = estimate_size(pd.DataFrame({'v': range(10)}))
+    cache = QueryCache(max_entries=100, max_bytes=int(entry_size * 2.5))
+    fill(cache, [0, 1, 2, 3])
+
+    assert list(cache._entries) == [('q', 2), ('q', 3)]
+    assert cache.get_stats()['bytes'] == 2 * entry_size
+
+
+def test_oversized_result_not_stored():
+    cache = QueryCache(max_bytes=16)
+    value = cache.get_or_compute('big', DAY, DAY, lambda: pd.DataFrame({'v': range(1000)}))
+
+    assert len(value) == 1000
+    assert cache.get_stats()['entries'] == 0 and cache.get_stats()['bytes'] == 0
+
+
+def test_invalidate_drops_only_overlapping_ranges():
+    cache = QueryCache()
+    fill(cache, [0, 1, 2, 3])
+    week = cache.get_or_compute('week', DAY, DAY + timedelta(days=6), lambda: [1, 2, 3])
+
+    dropped = cache.invalidate(DAY + timedelta(days=2), DAY + timedelta(days=2))
+
+    assert week == [1, 2, 3] and dropped == 2
+    assert set(cache._entries) == {('q', 0), ('q', 1), ('q', 3)}
+    assert cache.get_stats()['bytes'] == sum(entry[3] for entry in cache._entries.values())
+
+
+def test_result_not_stored_after_overlapping_invalidation():
+    cache = QueryCache()
+
+    def compute():
+        cache.invalidate(DAY, DAY)  # New data lands in the range while the query runs
+        return [1]
+
+    assert cache.get_or_compute('k', DAY, DAY + timedelta(days=1), compute) == [1]
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_result_stored_after_unrelated_invalidation():
+    cache = QueryCache()
+
+    def compute():
+        cache.invalidate(DAY + timedelta(days=5), DAY + timedelta(days=5))
+        return [1]
+
+    cache.get_or_compute('k', DAY, DAY + timedelta(days=1), compute)
+    assert cache.get_stats()['entries'] == 1
+
+
+def test_result_not_stored_when_invalidation_log_truncated():
+    cache = QueryCache()
+
+    def compute():
+        # Far more unrelated invalidations than the log keeps, so overlap can no longer be ruled out
+        for _ in range(cache._invalidations.maxlen + 10):
+            cache.invalidate(DAY + timedelta(days=5), DAY + timedelta(days=5))
+        return [1]
+
+    cache.get_or_compute('k', DAY, DAY + timedelta(days=1), compute)
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_cached_daily_query_splits_at_today():
+    cache = QueryCache()
+    today = datetime.now().date()
+    start = today - timedelta(days=3)
+    calls = []
+
+    def compute(first, last):
+        calls.append((first, last))
+        return pd.DataFrame({'date': pd.date_range(first, last)})
+
+    result = cached_daily_query(cache, 'production', 'count', ['M1'], start, today, compute)
+    assert calls == [(start, today - timedelta(days=1)), (today, today)]
+    assert result['date'].dt.date.tolist() == [start + timedelta(days=i) for i in range(4)]
+
+    # New live data only invalidates today's tail; the historical days stay cached
+    cache.invalidate(today, today)
+    cached_daily_query(cache, 'production', 'count', ['M1'], start, today, compute)
+    assert calls[2:] == [(today, today)]
+
+
+def test_cached_daily_query_past_range_single_part():
+    cache = QueryCache()
+    end = datetime.now().date() - timedelta(days=1)
+    calls = []
+
+    def compute(first, last):
+        calls.append((first, last))
+        return pd.DataFrame({'v': [1]})
+
+    cached_daily_query(cache, 'production', 'count', None, end - timedelta(days=6), end, compute)
+    cached_daily_query(cache, 'production', 'count', None, end - timedelta(days=6), end, compute)
+
+    assert calls == [(end - timedelta(days=6), end)]
+    assert cache.get_stats()['hits'] == 1
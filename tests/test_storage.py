@@ -0,0 +1,96 @@
+import time
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+import pytest
+from storage import TelemetryStore
+from backfill import simulate_day
+
+
+@pytest.fixture
+def berlin_time(monkeypatch):
+    """Run a test in a time zone with daylight saving changes"""
+    monkeypatch.setenv("TZ", "Europe/Berlin")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_append_partitions_by_day(tmp_path):
+    store = TelemetryStore(str(tmp_path))
+    timestamps = pd.date_range("2026-01-01 22:00", periods=6, freq="h")
+    frame = pd.DataFrame({'timestamp': timestamps, 'machine': ["M1", "M2"] * 3, 'temperature': np.arange(6.0)})
+
+    assert store.append('telemetry', frame) == 6
+    assert store.days('telemetry') == [date(2026, 1, 1), date(2026, 1, 2)]
+    assert len(store.read('telemetry', date(2026, 1, 1), date(2026, 1, 1))) == 2
+
+    result = store.read('telemetry', date(2026, 1, 1), date(2026, 1, 2))
+    pd.testing.assert_frame_equal(result, frame)
+    assert store.row_counts()['telemetry'] == 6
+
+
+def test_appends_add_partition_files_read_in_order(tmp_path):
+    store = TelemetryStore(str(tmp_path))
+    first = pd.DataFrame({'timestamp': pd.date_range("2026-01-01 08:00", periods=3, freq="h"), 'value': [1, 2, 3]})
+    second = pd.DataFrame({'timestamp': pd.date_range("2026-01-01 12:00", periods=2, freq="h"), 'value': [4, 5]})
+    store.append('telemetry', first)
+    store.append('telemetry', second)
+
+    chunks = list(store.iter_chunks('telemetry', date(2026, 1, 1), date(2026, 1, 1)))
+    assert [chunk['value'].tolist() for chunk in chunks] == [[1, 2, 3], [4, 5]]
+
+
+def test_string_columns_round_trip(tmp_path):
+    store = TelemetryStore(str(tmp_path))
+    frame = pd.DataFrame({
+        'machine': ["Line-A-Press-01", "Line-B-Welding-03", "Line-A-Press-01"],
+        'reason': ["Tool Change", "Maintenance", "Material Shortage"],
+        'start_time': pd.to_datetime(["2026-01-05 06:10", "2026-01-05 09:30", "2026-01-06 14:00"]),
+        'duration_minutes': [15, 120, 45]
+    })
+    store.append('downtime', frame)
+
+    result = store.read('downtime', date(2026, 1, 1), date(2026, 1, 31))
+    assert result['machine'].tolist() == frame['machine'].tolist()
+    assert result['reason'].tolist() == frame['reason'].tolist()
+    assert result['start_time'].tolist() == frame['start_time'].tolist()
+    # Strings are stored as fixed-width unicode, so reading needs no pickles
+    assert store.read('downtime', date(2026, 1, 5), date(2026, 1, 5), machines=["Line-A-Press-01"])['reason'].tolist() \
+        == ["Tool Change"]
+
+
+def test_unknown_table_and_empty_frame(tmp_path):
+    store = TelemetryStore(str(tmp_path))
+
+    with pytest.raises(ValueError):
+        store.append('sensors', pd.DataFrame({'timestamp': [datetime(2026, 1, 1)]}))
+    assert store.append('telemetry', pd.DataFrame()) == 0
+    assert store.read('telemetry', date(2026, 1, 1), date(2026, 1, 2)).empty
+
+
+def test_alert_partitions_use_local_day_across_dst(tmp_path, berlin_time):
+    store = TelemetryStore(str(tmp_path))
+    # Half an hour either side of local midnight, before (UTC+1) and after (UTC+2) the spring change
+    utc = pd.to_datetime(["2026-03-28 22:30", "2026-03-28 23:30", "2026-03-29 21:30", "2026-03-29 22:30"])
+    created_at = (utc - pd.Timestamp("1970-01-01")).total_seconds().to_numpy()
+    store.append('alerts', pd.DataFrame({'created_at': created_at, 'machine': ["M1"] * 4, 'kind': [1, 2, 3, 4]}))
+
+    expected = [datetime.fromtimestamp(epoch).date() for epoch in created_at]
+    assert expected == [date(2026, 3, 28), date(2026, 3, 29), date(2026, 3, 29), date(2026, 3, 30)]
+    assert store.days('alerts') == [date(2026, 3, 28), date(2026, 3, 29), date(2026, 3, 30)]
+    assert store.read('alerts', date(2026, 3, 29), date(2026, 3, 29))['kind'].tolist() == [2, 3]
+    np.testing.assert_array_equal(store.read('alerts', date(2026, 3, 28), date(2026, 3, 30))['created_at'], created_at)
+
+
+def test_simulated_downtime_scales_with_fleet():
+    day = date(2026, 1, 5)
+    small = simulate_day(day, 6, 60, 1, seed=1)['downtime']
+    large = simulate_day(day, 60, 60, 1, seed=1)['downtime']
+
+    assert large['machine'].nunique() == 60
+    assert 60 <= len(large) <= 4 * 60 and len(small) <= 4 * 6
+    assert large['start_time'].is_monotonic_increasing
+    assert (large['start_time'].dt.date == day).all()
+    assert large['start_time'].min() >= datetime(2026, 1, 5, 6)
@@ -37,6 +37,49 @@ def get_shift_info():
     else:
         return "Night Shift", "22:00 - 06:00"
 
+def get_shift_window(when):
+    """Get the name, start and end datetimes of the shift containing `when`"""
+    from datetime import datetime, timedelta
+
+    day_start = datetime.combine(when.date(), datetime.min.time())
+
+    if 6 <= when.hour < 14:
+        return "Day Shift", day_start + timedelta(hours=6), day_start + timedelta(hours=14)
+    elif 14 <= when.hour < 22:
+        return "Evening Shift", day_start + timedelta(hours=14), day_start + timedelta(hours=22)
+    elif when.hour >= 22:
+        return "Night Shift", day_start + timedelta(hours=22), day_start + timedelta(hours=30)
+    else:
+        return "Night Shift", day_start - timedelta(hours=2), day_start + timedelta(hours=6)
+
+def local_epoch_seconds(times):
+    """Convert naive local datetime64 values to epoch seconds, matching datetime.timestamp()
+
+    The UTC offset is looked up once per distinct hour, so readings either side of a
+    daylight saving change each get their own offset.
+    """
+    import numpy as np
+    from datetime import datetime
+
+    times = np.asarray(times).astype('datetime64[ms]')
+    hours, inverse = np.unique(times.astype('datetime64[h]'), return_inverse=True)
+    naive_seconds = hours.astype('datetime64[s]').astype(np.int64)
+    offsets = np.array([naive - datetime.fromisoformat(str(hour)).timestamp()
+                        for naive, hour in zip(naive_seconds, hours.astype('datetime64[s]'))])
+    return times.astype(np.int64) / 1000 - offsets[inverse].reshape(times.shape)
+
+def local_datetimes(epoch_seconds):
+    """Convert epoch seconds to naive local datetime64 values, matching datetime.fromtimestamp()"""
+    import numpy as np
+    from datetime import datetime
+
+    epoch_seconds = np.asarray(epoch_seconds, dtype=float)
+    hours, inverse = np.unique(np.floor(epoch_seconds / 3600), return_inverse=True)
+    offsets = np.array([datetime.fromtimestamp(hour * 3600).astimezone().utcoffset().total_seconds()
+                        for hour in hours])
+    local_ms = np.round((epoch_seconds + offsets[inverse].reshape(epoch_seconds.shape)) * 1000)
+    return local_ms.astype(np.int64).astype('datetime64[ms]')
+
 def format_duration(minutes):
     """Format duration from minutes to human readable format"""
     if minutes < 60:
@@ -96,3 +139,10 @@ def get_machine_category(machine_name):
         return "Quality Control"
     else:
         return "General"
+
+def get_machine_line(machine_name):
+    """Get the production line a machine belongs to, e.g. Line-B for Line-B-Welding-03"""
+    parts = machine_name.split("-")
+    if parts[0] == "Line" and len(parts) > 1:
+        return f"Line-{parts[1]}"
+    return parts[0]